@@ -0,0 +1,36 @@
+"""
+Shared access-control decorators for API and page routes
+"""
+from functools import wraps
+from flask import current_app, flash, redirect, url_for, jsonify
+from flask_login import current_user
+
+# The admin decorators also enforce login, so admin routes don't need
+# @login_required stacked on top (one current_user resolution per request).
+
+
+def admin_required(f):
+    """Decorator to require a logged-in admin on page routes (flashes and redirects)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user = current_user._get_current_object()  # type: ignore[attr-defined]
+        if not user.is_authenticated:
+            return current_app.login_manager.unauthorized()  # type: ignore[attr-defined]
+        if not user.is_admin:
+            flash('You need admin privileges to access this page.', 'error')
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def admin_required_json(f):
+    """Decorator to require a logged-in admin on JSON routes (returns 403)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user = current_user._get_current_object()  # type: ignore[attr-defined]
+        if not user.is_authenticated:
+            return current_app.login_manager.unauthorized()  # type: ignore[attr-defined]
+        if not user.is_admin:
+            return jsonify({'error': 'Admin privileges required'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
@@ -3,34 +3,31 @@ Authentication blueprint for user management
 """
 from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
-from models.auth import User, LoginLog, db
-from forms.user_forms import LoginForm, SignupForm, ChangePasswordForm, UserManagementForm, CreateUserForm
+from sqlalchemy.orm import joinedload, defer
+from models.auth import User, LoginLog, db, queue_login_log
+from forms.user_forms import LoginForm, SignupForm, ChangePasswordForm, UserManagementForm, CreateUserForm, clear_user_lookup_cache
+from api.auth_decorators import admin_required
 from datetime import datetime
-from functools import wraps
 
 auth_bp = Blueprint('auth', __name__)
 
-def admin_required(f):
-    """Decorator to require admin privileges"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or not current_user.is_admin:
-            flash('You need admin privileges to access this page.', 'error')
-            return redirect(url_for('auth.login'))
-        return f(*args, **kwargs)
-    return decorated_function
-
 def log_user_login(user, request):
-    """Log user login"""
+    """Log user login via the batched audit writer"""
+    now = datetime.utcnow()
+    ip_address = request.environ.get('HTTP_X_REAL_IP', request.remote_addr)
+    user_agent = request.headers.get('User-Agent')
+    if queue_login_log(user.id, now, ip_address, user_agent):
+        return
+
+    # Writer is backed up; record this login directly
+    user.last_login = now
+
     login_log = LoginLog()
     login_log.user_id = user.id
-    login_log.login_time = datetime.utcnow()
-    login_log.ip_address = request.environ.get('HTTP_X_REAL_IP', request.remote_addr)
-    login_log.user_agent = request.headers.get('User-Agent')
+    login_log.login_time = now
+    login_log.ip_address = ip_address
+    login_log.user_agent = user_agent
     db.session.add(login_log)
-    
-    # Update user's last login time
-    user.last_login = datetime.utcnow()
     db.session.commit()
 
 @auth_bp.route('/login', methods=['GET', 'POST'])
@@ -43,8 +40,8 @@ def login():
     
     form = LoginForm()
     if form.validate_on_submit():
-        user = User.query.filter_by(username=form.username.data).first()
-        if user and user.check_password(form.password.data):
+        user = User.authenticate(form.username.data, form.password.data)
+        if user:
             if not user.is_active:
                 flash('Your account is inactive. Please contact administrator.', 'error')
                 return render_template('auth/login.html', form=form)
@@ -83,6 +80,7 @@ def signup():
         
         db.session.add(user)
         db.session.commit()
+        clear_user_lookup_cache()
         
         flash('Registration successful! Your account is pending admin approval.', 'success')
         return redirect(url_for('auth.login'))
@@ -115,15 +113,14 @@ def logout():
     return redirect(url_for('auth.login'))
 
 @auth_bp.route('/admin/users')
-@login_required
 @admin_required
 def user_management():
     """User management page for admin"""
-    users = User.query.all()
+    # The listing only renders profile columns; skip the password hash
+    users = User.query.options(defer(User.password_hash)).all()
     return render_template('auth/user_management.html', users=users)
 
 @auth_bp.route('/admin/users/<int:user_id>/edit', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def edit_user(user_id):
     """Edit user page"""
@@ -143,6 +140,7 @@ def edit_user(user_id):
         user.is_admin = form.is_admin.data
         user.streaming_enabled = form.streaming_enabled.data
         db.session.commit()
+        clear_user_lookup_cache()
         flash(f'User {user.username} updated successfully!', 'success')
         return redirect(url_for('auth.user_management'))
     
@@ -157,7 +155,6 @@ def edit_user(user_id):
     return render_template('auth/edit_user.html', form=form, user=user)
 
 @auth_bp.route('/admin/users/create', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def create_user():
     """Create new user page"""
@@ -175,13 +172,13 @@ def create_user():
         
         db.session.add(user)
         db.session.commit()
+        clear_user_lookup_cache()
         flash(f'User {user.username} created successfully!', 'success')
         return redirect(url_for('auth.user_management'))
     
     return render_template('auth/create_user.html', form=form)
 
 @auth_bp.route('/admin/users/<int:user_id>/delete', methods=['POST'])
-@login_required
 @admin_required
 def delete_user(user_id):
     """Delete user"""
@@ -192,33 +189,33 @@ def delete_user(user_id):
         flash('You cannot delete your own account!', 'error')
         return redirect(url_for('auth.user_management'))
     
-    # Prevent deleting the last admin
-    admin_count = User.query.filter_by(is_admin=True).count()
-    if user.is_admin and admin_count <= 1:
+    # Prevent deleting the last admin (only admins need the count)
+    if user.is_admin and User.query.filter_by(is_admin=True).count() <= 1:
         flash('Cannot delete the last admin user!', 'error')
         return redirect(url_for('auth.user_management'))
     
     db.session.delete(user)
     db.session.commit()
+    clear_user_lookup_cache()
     flash(f'User {user.username} deleted successfully!', 'success')
     return redirect(url_for('auth.user_management'))
 
 @auth_bp.route('/admin/login-logs')
-@login_required
 @admin_required
 def login_logs():
     """View login logs"""
     page = request.args.get('page', 1, type=int)
     per_page = 50
     
-    logs = LoginLog.query.join(User).order_by(LoginLog.login_time.desc()).paginate(
+    # Eager-load the user so the template does not issue one SELECT per row; the inner
+    # join keeps orphaned rows (user deleted after the log was queued) out of the page
+    logs = LoginLog.query.options(joinedload(LoginLog.user, innerjoin=True)).order_by(LoginLog.login_time.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
     
     return render_template('auth/login_logs.html', logs=logs)
 
 @auth_bp.route('/admin/users/<int:user_id>/toggle-streaming', methods=['POST'])
-@login_required
 @admin_required
 def toggle_streaming(user_id):
     """Toggle streaming permission for a user"""
@@ -1,8 +1,11 @@
 """
 Camera API Routes - Clean separation between read and write operations
 """
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from flask import Blueprint, request, jsonify
 from services.controller.camera_service import camera_service, camera_control_service
+from config.settings import config
 import logging
 
 # Separate blueprints for read and control operations
@@ -11,17 +14,60 @@ camera_control_bp = Blueprint('camera_control', __name__)
 
 logger = logging.getLogger(__name__)
 
+# Camera RPCs run off the request thread so a slow camera can't stall the worker.
+# One worker is enough: controller calls are serialized, and at most one read is in flight.
+_camera_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='camera-info')
+_last_camera_info = None  # (status, presets) from the most recent completed read
+_pending_read = None  # future of the read currently in flight, shared by concurrent polls
+_pending_read_lock = threading.Lock()
+
+
+def _read_camera_info():
+    """Fetch camera status and presets (runs on the camera executor)"""
+    return camera_service.get_status(), camera_service.get_presets()
+
+
+def _remember_camera_info(future):
+    """Keep the latest successful read to serve while a new one is in flight"""
+    global _last_camera_info
+    if not future.cancelled() and future.exception() is None:
+        _last_camera_info = future.result()
+
+
+def _get_camera_info_future():
+    """Return the in-flight camera read, starting a new one only when none is pending"""
+    global _pending_read
+    with _pending_read_lock:
+        if _pending_read is None or _pending_read.done():
+            _pending_read = _camera_executor.submit(_read_camera_info)
+            _pending_read.add_done_callback(_remember_camera_info)
+        return _pending_read
+
 
 # ==================== READ-ONLY CAMERA INFORMATION ROUTES ====================
 @camera_info_bp.route('/api/camera/info', methods=['GET'])
 def get_camera_info():
     """Get camera basic information, connection status, and presets."""
     try:
-        # Get camera status
-        status = camera_service.get_status()
-        
-        # Get camera presets
-        presets = camera_service.get_presets()
+        future = _get_camera_info_future()
+        cached = _last_camera_info
+        try:
+            # Nothing cached yet: allow the first read longer, but never block indefinitely
+            timeout = config.CAMERA_INFO_TIMEOUT_SEC if cached is not None else config.CAMERA_INFO_FIRST_TIMEOUT_SEC
+            status, presets = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if cached is None:
+                logger.warning("Camera info request timed out with no cached status; reporting offline")
+                return jsonify({
+                    'success': False,
+                    'device_model': 'Offline',
+                    'privacy_mode': False,
+                    'connection_status': 'offline',
+                    'presets': [],
+                    'error': 'Camera did not respond in time'
+                })
+            logger.warning("Camera info request timed out; serving last known status")
+            status, presets = cached
         
         return jsonify({
             'success': status['available'],
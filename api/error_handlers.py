@@ -1,23 +1,45 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, Response, render_template, request
 
 errors_bp = Blueprint('errors', __name__)
 
+# Prebuilt JSON bodies for API clients, keyed by status code
+_JSON_ERROR_BODIES = {
+    401: b'{"error":"Unauthorized"}',
+    403: b'{"error":"Forbidden"}',
+    404: b'{"error":"Not found"}',
+    500: b'{"error":"Internal server error"}',
+    503: b'{"error":"Service unavailable"}',
+}
+
+# Error pages are static apart from url_for links, so render each template once
+_html_cache = {}
+
+def _error_response(template, status):
+    """Return a JSON error for API requests, otherwise the cached error page"""
+    if request.path.startswith('/api/') or request.accept_mimetypes.best == 'application/json':
+        return Response(_JSON_ERROR_BODIES[status], status=status, mimetype='application/json')
+
+    html = _html_cache.get(template)
+    if html is None:
+        html = _html_cache[template] = render_template(template)
+    return Response(html, status=status, mimetype='text/html')
+
 @errors_bp.app_errorhandler(404)
 def not_found_error(error):
-    return render_template('errors/404.html'), 404
+    return _error_response('errors/404.html', 404)
 
 @errors_bp.app_errorhandler(401)
 def unauthorized_error(error):
-    return render_template('errors/401.html'), 401
+    return _error_response('errors/401.html', 401)
 
 @errors_bp.app_errorhandler(403)
 def forbidden_error(error):
-    return render_template('errors/401.html'), 403
+    return _error_response('errors/401.html', 403)
 
 @errors_bp.app_errorhandler(500)
 def internal_error(error):
-    return render_template('errors/500.html'), 500
+    return _error_response('errors/500.html', 500)
 
 @errors_bp.app_errorhandler(503)
 def service_unavailable_error(error):
-    return render_template('errors/500.html'), 503
+    return _error_response('errors/500.html', 503)
@@ -4,12 +4,15 @@ Metrics API routes for system and streaming metrics
 from flask import Blueprint, jsonify
 from flask_login import login_required
 from services.streaming.streaming_service import get_streaming_service
+from services.monitoring.system_metrics import get_system_metrics_sampler
+from api.response_cache import cached_json
 
 metrics_bp = Blueprint('metrics', __name__)
 
 
 @metrics_bp.route('/metrics')
 @login_required
+@cached_json(timeout=1)
 def get_metrics():
     """Get system and streaming metrics"""
     streaming_service = get_streaming_service()
@@ -18,10 +21,10 @@ def get_metrics():
         return jsonify(metrics)
     else:
         # Return basic metrics when streaming is not available
-        import psutil
+        cpu, memory = get_system_metrics_sampler().get_usage()
         return jsonify({
-            'cpu': psutil.cpu_percent(interval=0.1),
-            'memory': psutil.virtual_memory().percent,
+            'cpu': cpu,
+            'memory': memory,
             'network': 0,
             'detection_rate': 0,
             'sleep_state': 'Offline',
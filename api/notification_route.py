@@ -1,15 +1,18 @@
 """
 Notification API routes
 """
-from flask import Blueprint, jsonify
+from datetime import datetime
+from flask import Blueprint, jsonify, request
 from flask_login import login_required
 from services.notification.notification_service import get_notification_service
+from api.response_cache import cached_json, invalidate
 
 notification_bp = Blueprint('notifications', __name__)
 
 
 @notification_bp.route('/notifications')
 @login_required
+@cached_json(timeout=3)
 def get_notifications():
     """Get recent notifications for the web interface"""
     notification_service = get_notification_service()
@@ -21,11 +24,31 @@ def get_notifications():
         return jsonify({'success': False, 'message': data, 'notifications': []}), 500
 
 
+@notification_bp.route('/notifications/older')
+@login_required
+def get_older_notifications():
+    """Page back through notifications older than the (before_ts, before_id) cursor"""
+    try:
+        before_ts = datetime.fromisoformat(request.args['before_ts'])
+    except (KeyError, ValueError):
+        return jsonify({'success': False, 'message': 'before_ts must be an ISO timestamp', 'notifications': []}), 400
+    before_id = request.args.get('before_id', type=int)
+    
+    notification_service = get_notification_service()
+    success, data = notification_service.get_recent_notifications(limit=20, before_ts=before_ts, before_id=before_id)
+    
+    if success:
+        return jsonify({'notifications': data})
+    else:
+        return jsonify({'success': False, 'message': data, 'notifications': []}), 500
+
+
 @notification_bp.route('/notifications/clear', methods=['POST'])
 @login_required
 def clear_all_notifications():
     """Clear all notifications"""
     notification_service = get_notification_service()
     success, message = notification_service.clear_all_notifications()
+    invalidate('get_notifications')
     
     return jsonify({'success': success, 'message': message})
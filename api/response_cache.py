@@ -0,0 +1,41 @@
+"""
+Short-lived response cache for frequently polled JSON endpoints
+"""
+import time
+import threading
+from functools import wraps
+from flask import current_app
+
+_cache = {}  # {key: (expires_at, body, status_code)}
+_lock = threading.Lock()
+
+
+def cached_json(timeout, key=None):
+    """Decorator to serve a view's successful JSON body from cache for `timeout` seconds.
+
+    Responses are shared between callers, so only use it on views whose
+    payload does not depend on the current user.
+    """
+    def decorator(f):
+        cache_key = key or f.__name__
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            now = time.monotonic()
+            entry = _cache.get(cache_key)
+            if entry is not None and entry[0] > now:
+                return current_app.response_class(entry[1], status=entry[2], mimetype='application/json')
+
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code == 200 and response.mimetype == 'application/json':
+                with _lock:
+                    _cache[cache_key] = (now + timeout, response.get_data(), response.status_code)
+            return response
+        return decorated_function
+    return decorator
+
+
+def invalidate(key):
+    """Drop a cached response so the next request recomputes it"""
+    with _lock:
+        _cache.pop(key, None)
@@ -1,42 +1,102 @@
 """
 WebSocket event handlers for real-time communication
 """
-from flask_socketio import emit
+import logging
+import operator
+import time
+from flask_socketio import emit, join_room
 from flask import request
 from flask_login import current_user
 from services.streaming.streaming_service import get_streaming_service
 from services.monitoring.monitor_service import get_monitor_service
 from services.monitoring.activity_tracker import get_activity_tracker
+from services.monitoring.broadcast_queue import BroadcastCoalescer
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+# Extract child_select click coordinates in one C-level call
+_xy = operator.itemgetter('x', 'y')
+
+
+# Monitor service status/toggle methods return a fresh dict already shaped
+# like the event payload; handlers tag it with 'success' and emit it as-is
+# instead of copying every key into a new dict.
+def _wrap_monitor_action(ok_event, error_event, action):
+    """Build a handler that runs a (success, data) monitor action and emits the result"""
+    def handler():
+        try:
+            success, data = action()
+            if not success:
+                emit(error_event, {'message': data})
+            elif isinstance(data, dict):
+                data['success'] = True
+                emit(ok_event, data)
+            else:
+                emit(ok_event, {'success': True, 'message': data})
+        except Exception as e:
+            emit(error_event, {'message': str(e)})
+    return handler
 
 
 def register_socketio_events(socketio):
-    """Register all WebSocket event handlers"""
+    """Register all WebSocket event handlers (call after initialize_streaming_service)"""
+    # Registering twice would make every @socketio.on handler fire twice per event
+    if getattr(socketio, '_baby_monitor_events_registered', False):
+        logger.warning("Socket.IO events already registered; skipping duplicate registration")
+        return socketio
+    socketio._baby_monitor_events_registered = True
+
+    # Process-wide singletons, resolved once instead of on every event
+    streaming_service = get_streaming_service()
+    monitor_service = get_monitor_service()
+    activity_tracker = get_activity_tracker()
+
+    # Per-connection status request throttling: {(sid, event): last_request_ts}
+    last_status_request = {}
+    # Bed status is global state, so one cached response serves every client: [ts, payload]
+    bed_status_cache = [0.0, None]
+
+    def status_throttled(event):
+        """Return True if this connection asked for the same status too recently"""
+        now = time.monotonic()
+        key = (request.sid, event)
+        if now - last_status_request.get(key, 0.0) < config.STATUS_MIN_INTERVAL_SEC:
+            return True
+        last_status_request[key] = now
+        return False
+
+    # Connect/disconnect storms collapse into one admin-room update per window
+    coalescer = BroadcastCoalescer(socketio)
+
+    def evict_idle_users_loop():
+        """Periodically drop idle users so the tracker stays small between broadcasts"""
+        while True:
+            socketio.sleep(config.ACTIVE_USER_EVICT_INTERVAL_SEC)
+            if activity_tracker.evict_idle_users():
+                coalescer.schedule('active_users_update', activity_tracker.get_snapshot, room='admin_room')
+
+    socketio.start_background_task(evict_idle_users_loop)
     
     @socketio.on('connect')
     def handle_connect():
         """Handle client connection"""
-        from flask_socketio import join_room
-        from models.auth import User
-        
-        streaming_service = get_streaming_service()
-        activity_tracker = get_activity_tracker()
-        
         # Track active user
         session_id = request.sid
         activity_tracker.add_active_user(current_user, session_id)
         
         # Check if user has streaming permissions and add to appropriate room
+        # current_user is already the loaded User row; no need to query it again
         if current_user and current_user.is_authenticated:
-            user = User.query.get(current_user.id)
-            if user and user.streaming_enabled:
+            if current_user.streaming_enabled:
                 join_room('streaming_enabled')
-                print(f"User {user.username} joined streaming room")
+                logger.debug("User %s joined streaming room", current_user.username)
             else:
-                print(f"User {user.username if user else 'Unknown'} denied streaming access")
+                logger.debug("User %s denied streaming access", current_user.username)
         
         if streaming_service:
             client_id, client_count = streaming_service.add_client()
-            print(f"Client {client_id} connected. Total clients: {client_count}")
+            logger.debug("Client %s connected. Total clients: %d", client_id, client_count)
             
             # Send initial connection success
             emit('connection_status', {
@@ -52,42 +112,33 @@ def register_socketio_events(socketio):
             })
         
         # Broadcast active users update to all admin users
-        socketio.emit('active_users_update', {
-            'active_users': activity_tracker.get_active_users(),
-            'count': activity_tracker.get_active_count()
-        }, room='admin_room')
+        coalescer.schedule('active_users_update', activity_tracker.get_snapshot, room='admin_room')
 
     @socketio.on('disconnect')
     def handle_disconnect():
         """Handle client disconnection"""
-        streaming_service = get_streaming_service()
-        activity_tracker = get_activity_tracker()
-        
         # Remove user from active tracking
-        user_id = current_user.id if current_user and hasattr(current_user, 'id') else 'anonymous'
-        activity_tracker.remove_active_user(user_id)
+        user_id = getattr(current_user, 'id', 'anonymous')
+        activity_tracker.remove_active_user(user_id, request.sid)
+        last_status_request.pop((request.sid, 'child_status'), None)
+        last_status_request.pop((request.sid, 'bed_status'), None)
         
         if streaming_service:
             client_count = streaming_service.remove_client()
-            print(f"Client disconnected. Total clients: {client_count}")
+            logger.debug("Client disconnected. Total clients: %d", client_count)
         
         # Broadcast active users update to all admin users
-        socketio.emit('active_users_update', {
-            'active_users': activity_tracker.get_active_users(),
-            'count': activity_tracker.get_active_count()
-        }, room='admin_room')
+        coalescer.schedule('active_users_update', activity_tracker.get_snapshot, room='admin_room')
 
     @socketio.on('test_message')
     def handle_test_message(data):
         """Handle test messages for debugging"""
-        print(f"Received test message: {data}")
+        logger.debug("Received test message: %s", data)
         emit('test_response', {'message': 'Server received: ' + str(data)})
 
     @socketio.on('request_quality_change')
     def handle_quality_change(data):
         """Handle client request for quality change"""
-        streaming_service = get_streaming_service()
-        
         if streaming_service:
             quality = data.get('quality', 80)
             new_quality = streaming_service.update_quality(quality)
@@ -98,11 +149,11 @@ def register_socketio_events(socketio):
     @socketio.on('child_select')
     def handle_child_select(data):
         """Handle child selection via WebSocket"""
-        monitor_service = get_monitor_service()
-        
         try:
-            x = data.get('x')
-            y = data.get('y')
+            try:
+                x, y = _xy(data)
+            except (KeyError, TypeError):
+                x = y = None
             
             if x is None or y is None:
                 emit('child_select_error', {'message': 'Missing coordinates'})
@@ -118,26 +169,12 @@ def register_socketio_events(socketio):
         except Exception as e:
             emit('child_select_error', {'message': str(e)})
 
-    @socketio.on('child_clear')
-    def handle_child_clear():
-        """Handle clearing child selection via WebSocket"""
-        monitor_service = get_monitor_service()
-        
-        try:
-            success, message = monitor_service.clear_child_selection()
-            
-            if success:
-                emit('child_clear_response', {'success': True, 'message': message})
-            else:
-                emit('child_clear_error', {'message': message})
-                
-        except Exception as e:
-            emit('child_clear_error', {'message': str(e)})
-
     @socketio.on('child_status_request')
     def handle_child_status_request():
         """Handle request for child status via WebSocket"""
-        monitor_service = get_monitor_service()
+        if status_throttled('child_status'):
+            emit('child_status_throttled', {'retry_after': config.STATUS_MIN_INTERVAL_SEC})
+            return
         
         try:
             success, data = monitor_service.get_child_status()
@@ -150,78 +187,36 @@ def register_socketio_events(socketio):
         except Exception as e:
             emit('child_status_error', {'message': str(e)})
 
-    @socketio.on('toggle_sleep_detection')
-    def handle_toggle_sleep_detection():
-        """Handle toggling sleep detection via WebSocket"""
-        monitor_service = get_monitor_service()
-        
-        try:
-            success, data = monitor_service.toggle_sleep_detection()
-            
-            if success:
-                emit('sleep_detection_toggled', {
-                    'success': True, 
-                    'enabled': data['enabled'], # type: ignore
-                    'message': data['message'] # type: ignore
-                })
-            else:
-                emit('sleep_detection_error', {'message': data})
-                
-        except Exception as e:
-            emit('sleep_detection_error', {'message': str(e)})
-
-    @socketio.on('toggle_recording_mode')
-    def handle_toggle_recording_mode():
-        """Handle toggling between raw/annotated recording mode via WebSocket"""
-        monitor_service = get_monitor_service()
-        
-        try:
-            success, data = monitor_service.toggle_recording_mode()
-            
-            if success:
-                emit('recording_mode_toggled', {
-                    'success': True,
-                    'annotated': data['annotated'], # type: ignore
-                    'message': data['message'] # type: ignore
-                })
-            else:
-                emit('recording_mode_error', {'message': data})
-                
-        except Exception as e:
-            emit('recording_mode_error', {'message': str(e)})
+    def reset_bed_cache():
+        """Reset the detector's bed cache and drop the cached bed status response"""
+        bed_status_cache[1] = None
+        return monitor_service.reset_bed_cache()
 
-    @socketio.on('reset_bed_cache')
-    def handle_reset_bed_cache():
-        """Handle bed cache reset via WebSocket"""
-        monitor_service = get_monitor_service()
-        
-        try:
-            success, message = monitor_service.reset_bed_cache()
-            
-            if success:
-                emit('bed_cache_reset', {'success': True, 'message': message})
-            else:
-                emit('bed_cache_error', {'message': message})
-                
-        except Exception as e:
-            emit('bed_cache_error', {'message': str(e)})
+    # Simple monitor actions: (event, success event, error event, action)
+    for event, ok_event, error_event, action in (
+        ('child_clear', 'child_clear_response', 'child_clear_error', monitor_service.clear_child_selection),
+        ('toggle_sleep_detection', 'sleep_detection_toggled', 'sleep_detection_error', monitor_service.toggle_sleep_detection),
+        ('toggle_recording_mode', 'recording_mode_toggled', 'recording_mode_error', monitor_service.toggle_recording_mode),
+        ('reset_bed_cache', 'bed_cache_reset', 'bed_cache_error', reset_bed_cache),
+    ):
+        socketio.on(event)(_wrap_monitor_action(ok_event, error_event, action))
 
     @socketio.on('bed_status_request')
     def handle_bed_status_request():
         """Handle bed status request via WebSocket"""
-        monitor_service = get_monitor_service()
+        now = time.monotonic()
+        if status_throttled('bed_status') and bed_status_cache[1] is not None \
+                and now - bed_status_cache[0] < config.STATUS_MIN_INTERVAL_SEC:
+            emit('bed_status', bed_status_cache[1])
+            return
         
         try:
             success, data = monitor_service.get_bed_status()
             
             if success:
-                emit('bed_status', {
-                    'success': True,
-                    'bed_cached': data['bed_cached'], # type: ignore
-                    'bed_box': data['bed_box'], # type: ignore
-                    'frames_confirmed': data['frames_confirmed'], # type: ignore
-                    'frames_since_detection': data['frames_since_detection'] # type: ignore
-                })
+                data['success'] = True  # type: ignore
+                bed_status_cache[0], bed_status_cache[1] = now, data
+                emit('bed_status', data)
             else:
                 emit('bed_status_error', {'message': data})
                 
@@ -231,32 +226,22 @@ def register_socketio_events(socketio):
     @socketio.on('join_admin_room')
     def handle_join_admin_room():
         """Handle admin users joining the admin room for active user updates"""
-        if current_user and hasattr(current_user, 'is_admin') and current_user.is_admin:
-            from flask_socketio import join_room
+        if current_user.is_authenticated and current_user.is_admin:
             join_room('admin_room')
             
             # Send current active users to the admin
-            activity_tracker = get_activity_tracker()
-            emit('active_users_update', {
-                'active_users': activity_tracker.get_active_users(),
-                'count': activity_tracker.get_active_count()
-            })
+            emit('active_users_update', activity_tracker.get_snapshot())
 
     @socketio.on('request_active_users')
     def handle_request_active_users():
         """Handle request for current active users (admin only)"""
-        if current_user and hasattr(current_user, 'is_admin') and current_user.is_admin:
-            activity_tracker = get_activity_tracker()
-            emit('active_users_update', {
-                'active_users': activity_tracker.get_active_users(),
-                'count': activity_tracker.get_active_count()
-            })
+        if current_user.is_authenticated and current_user.is_admin:
+            emit('active_users_update', activity_tracker.get_snapshot())
 
     @socketio.on('heartbeat')
     def handle_heartbeat():
         """Handle heartbeat to keep user active"""
-        activity_tracker = get_activity_tracker()
-        user_id = current_user.id if current_user and hasattr(current_user, 'id') else 'anonymous'
+        user_id = getattr(current_user, 'id', 'anonymous')
         activity_tracker.update_last_seen(user_id)
 
     return socketio
@@ -264,42 +249,27 @@ def register_socketio_events(socketio):
 
 def notify_streaming_change(socketio, user_id, streaming_enabled):
     """Notify specific user about streaming permission change"""
-    from services.monitoring.activity_tracker import get_activity_tracker
-    from flask_socketio import join_room, leave_room
-    
     activity_tracker = get_activity_tracker()
-    active_users = activity_tracker.get_active_users()
+    session_ids = activity_tracker.get_sessions(user_id)
     
-    print(f"[DEBUG] Notifying user {user_id} about streaming change: {streaming_enabled}")
-    print(f"[DEBUG] Active users: {[user.get('id') for user in active_users]}")
+    logger.debug("Notifying user %s about streaming change: %s", user_id, streaming_enabled)
+    logger.debug("Sessions for user %s: %s", user_id, session_ids)
     
-    # Find the user's session and notify them
-    user_found = False
-    for user_info in active_users:
-        if user_info.get('id') == user_id:
-            user_found = True
-            session_id = user_info.get('session_id')
-            print(f"[DEBUG] Found user {user_id} with session {session_id}")
-            
-            if session_id:
-                if streaming_enabled:
-                    # Add user to streaming room
-                    socketio.server.enter_room(session_id, 'streaming_enabled')
-                    print(f"[DEBUG] User {user_id} added to streaming room")
-                else:
-                    # Remove user from streaming room
-                    socketio.server.leave_room(session_id, 'streaming_enabled')
-                    print(f"[DEBUG] User {user_id} removed from streaming room")
-                
-                # Send direct message to the user's session
-                socketio.emit('streaming_permission_changed', {
-                    'streaming_enabled': streaming_enabled,
-                    'message': 'Your streaming permission has been updated by an administrator.'
-                }, room=session_id)
-                print(f"[DEBUG] Sent permission change notification to session {session_id}")
+    # Update room membership per session, then notify all of them with one emit
+    user_found = bool(session_ids)
+    room_action = socketio.server.enter_room if streaming_enabled else socketio.server.leave_room
+    for session_id in session_ids:
+        room_action(session_id, 'streaming_enabled')
     
-    if not user_found:
-        print(f"[DEBUG] User {user_id} not found in active users, sending broadcast")
+    if user_found:
+        logger.debug("User %s %s streaming room", user_id, 'added to' if streaming_enabled else 'removed from')
+        socketio.emit('streaming_permission_changed', {
+            'streaming_enabled': streaming_enabled,
+            'message': 'Your streaming permission has been updated by an administrator.'
+        }, to=list(session_ids))
+        logger.debug("Sent permission change notification to sessions %s", session_ids)
+    else:
+        logger.debug("User %s not found in active users, sending broadcast", user_id)
         # If user not found in active users, try broadcasting to all sessions
         socketio.emit('streaming_permission_changed', {
             'streaming_enabled': streaming_enabled,
@@ -1,9 +1,13 @@
 from flask import Flask, render_template
+from flask.json.provider import DefaultJSONProvider
 from flask_socketio import SocketIO
 from flask_login import LoginManager, login_required
 import os
+import functools
+import logging
+import orjson
 from config.settings import config
-from models.notification import notification_manager
+from models.notification import notification_manager, db
 from models.auth import User, init_db
 from api.auth_route import auth_bp
 from api.metrics_route import metrics_bp
@@ -14,18 +18,62 @@ from api.websocket_handlers import register_socketio_events
 from api.camera_api import camera_info_bp, camera_control_bp
 from services.streaming.streaming_service import initialize_streaming_service
 
+# Configure logging once for the whole process
+logging.basicConfig(
+    level=getattr(logging, str(config.LOG_LEVEL).upper(), logging.INFO),
+    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+)
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = '23ysE&^!(*hqd88q7d8qdjhqe&(S^QW(69q7y6edqdq89dy7hqui'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///{}'.format(config.DATABASE_PATH)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': config.DB_POOL_SIZE,
+    'max_overflow': config.DB_MAX_OVERFLOW,
+    'pool_timeout': config.DB_POOL_TIMEOUT,
+}
+
+class _OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson: compact, unsorted output for the polled endpoints"""
+    # Datetimes go through Flask's default() so responses keep the HTTP-date format
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app.json = _OrjsonProvider(app)
 
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+class _OrjsonCodec:
+    """json-module shim so Socket.IO packets are encoded with orjson"""
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
 
-os.makedirs(os.path.dirname(config.MONITOR_RECORDINGS_DIR), exist_ok=True)
-os.makedirs(os.path.dirname(config.SNAPSHOTS_DIR), exist_ok=True)
-os.makedirs(os.path.dirname(config.LOG_FILE), exist_ok=True)
-os.makedirs(os.path.dirname(config.YOLO_MODEL_PATH), exist_ok=True)
-os.makedirs(os.path.dirname(config.DATABASE_PATH), exist_ok=True)
+    @staticmethod
+    def dumps(obj, **kwargs):
+        # python-socketio passes stdlib kwargs (separators); orjson output is already compact
+        return orjson.dumps(obj, option=_OrjsonCodec._OPTIONS).decode()
+
+    loads = staticmethod(orjson.loads)
+
+# Threading mode is deliberate: YOLO inference and OpenCV capture are CPU-bound
+# C calls that never yield to a green-thread hub, so eventlet/gevent would stall
+# every socket while a frame is processed. Fan-out cost is kept down instead by
+# coalescing admin broadcasts and emitting to rooms rather than per-socket loops.
+# With SOCKETIO_MESSAGE_QUEUE set, emits are published to the queue and fanned out
+# by each server's listener thread (needs the redis package for redis:// URLs).
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading', json=_OrjsonCodec,
+                    message_queue=config.SOCKETIO_MESSAGE_QUEUE)
+
+@functools.cache
+def _ensure_dirs():
+    """Create the configured data directories (once per process)"""
+    for directory in config.REQUIRED_DIRS:
+        os.makedirs(directory, exist_ok=True)
+
+_ensure_dirs()
 
 
 # Initialize authentication
@@ -37,7 +85,8 @@ login_manager.login_message_category = 'info'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Session.get checks the identity map before issuing a SELECT
+    return db.session.get(User, int(user_id))
 
 # Register blueprints
 app.register_blueprint(auth_bp, url_prefix='/auth')
@@ -105,6 +154,11 @@ def index():
 def health_check():
     return {"status": "healthy"}, 200
 
+# Database connection pool saturation
+@app.route('/health/db')
+def db_health_check():
+    return {"status": "healthy", "pool": db.engine.pool.status()}, 200
+
 
 if __name__ == '__main__':
     # Production-ready configuration with WebSocket support
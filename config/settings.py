@@ -2,90 +2,138 @@
 Configuration settings for RTSP Recorder application
 """
 import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+_BASE_DIR = "/app/baby-monitor" if os.path.exists("/app/baby-monitor") \
+    else os.path.join(os.path.expanduser("~"), "baby-monitor")
+_YOLO_MODEL_NAME = os.getenv("MODEL_NAME", "yolov8n.pt")
+
+
+# slots=True turns every config.X read on the frame path into a slot lookup.
+# Not frozen: a few settings (CONFIDENCE_THRESHOLD, SHOW_PREVIEW) are updated
+# at runtime on the shared instance that other modules imported.
+@dataclass(slots=True)
 class BabyMonitorSettings:
     """Main configuration class for RTSP Recorder"""
 
     # ==================== RTSP Settings ====================
-    RTSP_URL = os.getenv("RTSP_URL") 
-    RTSP_TIMEOUT = int(os.getenv("RTSP_TIMEOUT", 10))
-    YOLO_MODEL_NAME = os.getenv("MODEL_NAME", "yolov8n.pt")
+    RTSP_URL: Optional[str] = os.getenv("RTSP_URL") 
+    RTSP_TIMEOUT: int = int(os.getenv("RTSP_TIMEOUT", 10))
+    YOLO_MODEL_NAME: str = _YOLO_MODEL_NAME
     
-    BASE_DIR = "/app/baby-monitor" if os.path.exists("/app/baby-monitor") \
-        else os.path.join(os.path.expanduser("~"), "baby-monitor")
-
-    YOLO_MODEL_PATH = os.path.join(BASE_DIR, "cache", YOLO_MODEL_NAME)
-    DATABASE_PATH = os.path.join(BASE_DIR, "database", "database.db")
-    LOG_FILE = os.path.join(BASE_DIR, "logs", "detections.log")
-    MONITOR_RECORDINGS_DIR = os.path.join(BASE_DIR, "recordings")
-    SNAPSHOTS_DIR = os.path.join(BASE_DIR, "snapshots")
-
-    SEGMENT_MINUTES = 30  # length of each video file in minutes
-    TIME_BLOCK_HOURS = 6  # how to split day into folders
-    SHOW_PREVIEW = True  # True = show live preview, False = headless
-    SAVE_ANNOTATED = True  # True = save video with boxes
+    BASE_DIR: str = _BASE_DIR
+
+    YOLO_MODEL_PATH: str = os.path.join(_BASE_DIR, "cache", _YOLO_MODEL_NAME)
+    DATABASE_PATH: str = os.path.join(_BASE_DIR, "database", "database.db")
+    LOG_FILE: str = os.path.join(_BASE_DIR, "logs", "detections.log")
+    MONITOR_RECORDINGS_DIR: str = os.path.join(_BASE_DIR, "recordings")
+    SNAPSHOTS_DIR: str = os.path.join(_BASE_DIR, "snapshots")
+
+    # Parent directories that must exist at startup, de-duplicated in order
+    REQUIRED_DIRS: Tuple[str, ...] = tuple(dict.fromkeys(os.path.dirname(path) for path in (
+        MONITOR_RECORDINGS_DIR, SNAPSHOTS_DIR, LOG_FILE, YOLO_MODEL_PATH, DATABASE_PATH
+    )))
+
+    SEGMENT_MINUTES: int = 30  # length of each video file in minutes
+    TIME_BLOCK_HOURS: int = 6  # how to split day into folders
+    SHOW_PREVIEW: bool = True  # True = show live preview, False = headless
+    SAVE_ANNOTATED: bool = True  # True = save video with boxes
     
     # ==================== AI Model Settings ====================
     # Use Docker-compatible paths if running in container
     
-    CONFIDENCE_THRESHOLD = 0.4  # detection confidence
-    TARGET_FPS = 30.0  # reduced fps for CPU processing
-    DEBUG_VIDEO = True  # enable extra video debugging output
+    CONFIDENCE_THRESHOLD: float = 0.4  # detection confidence
+    YOLO_IMGSZ: int = int(os.getenv("YOLO_IMGSZ", 640))  # inference size; frames are downscaled to this first
+    YOLO_TORCH_THREADS: int = int(os.getenv("YOLO_TORCH_THREADS", 0))  # 0 = half the CPU cores
+    YOLO_WARMUP: bool = os.getenv("YOLO_WARMUP", "true").lower() == "true"  # dummy inference at load time
+    YOLO_BACKEND: str = os.getenv("YOLO_BACKEND", "pytorch").lower()  # pytorch, openvino or onnx (exported once on first load)
+    YOLO_TORCH_COMPILE: bool = os.getenv("YOLO_TORCH_COMPILE", "false").lower() == "true"  # torch.compile the .pt model at load
+    YOLO_QUANTIZED: bool = os.getenv("YOLO_QUANTIZED", "false").lower() == "true"  # load the INT8 OpenVINO export if present
+    MOTION_GATE_THRESHOLD: float = float(os.getenv("MOTION_GATE_THRESHOLD", 2.0))  # mean pixel delta below which inference is skipped; 0 disables
+    FORCE_DETECT_INTERVAL: int = int(os.getenv("FORCE_DETECT_INTERVAL", 15))  # max consecutive skipped frames
+    TARGET_FPS: float = 30.0  # reduced fps for CPU processing
+    DEBUG_VIDEO: bool = True  # enable extra video debugging output
     
     # GPU usage flag
-    USE_GPU = False
-    GPU_DEVICE_INDEX = int(os.getenv("GPU_DEVICE_INDEX", 0))  # which GPU to use
+    USE_GPU: bool = False
+    GPU_DEVICE_INDEX: int = int(os.getenv("GPU_DEVICE_INDEX", 0))  # which GPU to use
     
     # ==================== Logging Settings ====================
     # Use Docker-compatible paths if running in container
     
-    NOTIFY_ON_PERSON = True  # OS notification for person/child alert
+    NOTIFY_ON_PERSON: bool = True  # OS notification for person/child alert
+    NOTIFICATION_GROUP_COMMIT: bool = os.getenv("NOTIFICATION_GROUP_COMMIT", "true").lower() == "true"  # write notifications behind in batches
     
     # ==================== Tracking Settings ====================
-    MANUAL_CHILD_SELECT = False  # click on the child once to lock on their track id
-    AUTO_SELECT_SMALLEST = True  # if not manually selected, pick smallest person bbox
+    MANUAL_CHILD_SELECT: bool = False  # click on the child once to lock on their track id
+    AUTO_SELECT_SMALLEST: bool = True  # if not manually selected, pick smallest person bbox
     
     # ==================== Safety Settings ====================
-    USE_BED_SAFE_ZONE = True
-    SAFE_MARGIN_RATIO = 0.15  # 15% inside bed rect is "safe"
-    RISK_FRAMES_THRESHOLD = 10  # consecutive frames outside safe zone before alert
-    ALERT_COOLDOWN_SEC = 20  # suppress repeated alerts within this period
+    USE_BED_SAFE_ZONE: bool = True
+    SAFE_MARGIN_RATIO: float = 0.15  # 15% inside bed rect is "safe"
+    RISK_FRAMES_THRESHOLD: int = 10  # consecutive frames outside safe zone before alert
+    ALERT_COOLDOWN_SEC: int = 20  # suppress repeated alerts within this period
     
     # ==================== Sleep Detection Settings ====================
-    SLEEP_DETECTION_ENABLED = True  # Enable sleep/wake monitoring
-    MOVEMENT_THRESHOLD = 30  # pixels - minimum movement to consider as "moving"
-    SLEEP_TIME_SEC = 150  # 2.5 minutes of no movement = sleep (150 seconds)
-    WAKE_NOTIFICATION_COOLDOWN = 60  # seconds between wake notifications
+    SLEEP_DETECTION_ENABLED: bool = True  # Enable sleep/wake monitoring
+    MOVEMENT_THRESHOLD: int = 30  # pixels - minimum movement to consider as "moving"
+    SLEEP_TIME_SEC: int = 150  # 2.5 minutes of no movement = sleep (150 seconds)
+    WAKE_NOTIFICATION_COOLDOWN: int = 60  # seconds between wake notifications
     
     # ==================== DeepSORT Settings ====================
-    MAX_AGE = 30
-    N_INIT = 3
-    MAX_COSINE_DISTANCE = 0.2
-    NN_BUDGET = 100
+    MAX_AGE: int = 30
+    N_INIT: int = 3
+    MAX_COSINE_DISTANCE: float = 0.2
+    NN_BUDGET: int = 100
     
     # ==================== RTSP Reader Settings ====================
-    MAX_RETRIES = 5
-    RETRY_DELAY = 3
-    MAX_FAILURES = 30  # consecutive failures before reconnecting
+    MAX_RETRIES: int = 5
+    RETRY_DELAY: int = 3
+    MAX_FAILURES: int = 30  # consecutive failures before reconnecting
 
     # tracker settings
-    CHILD_HISTORY_SIZE = 30
-    CHILD_MIN_HISTORY = 5
-    CHILD_HEIGHT_RATIO_THRESHOLD = 0.50
-    CHILD_STABILITY_FRAMES = 3
+    CHILD_HISTORY_SIZE: int = 30
+    CHILD_MIN_HISTORY: int = 5
+    CHILD_HEIGHT_RATIO_THRESHOLD: float = 0.50
+    CHILD_STABILITY_FRAMES: int = 3
+
+    LOG_LEVEL: str = "INFO"
+
+    # ==================== Active User Settings ====================
+    ACTIVE_USER_IDLE_TTL_SEC: int = int(os.getenv("ACTIVE_USER_IDLE_TTL_SEC", 300))  # drop users without a heartbeat for this long
+    ACTIVE_USER_EVICT_INTERVAL_SEC: int = int(os.getenv("ACTIVE_USER_EVICT_INTERVAL_SEC", 30))  # how often the eviction sweep runs
+    STATUS_MIN_INTERVAL_SEC: float = float(os.getenv("STATUS_MIN_INTERVAL_SEC", 0.05))  # per-connection floor between status requests
+
+    # ==================== Auth Settings ====================
+    # Werkzeug hash method, e.g. "scrypt" (default) or "pbkdf2:sha256:600000"
+    PASSWORD_HASH_METHOD: str = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+    PASSWORD_REHASH_ON_LOGIN: bool = os.getenv("PASSWORD_REHASH_ON_LOGIN", "true").lower() == "true"
+
+    # ==================== Socket.IO Settings ====================
+    # Optional pub/sub URL (e.g. redis://localhost:6379/1); unset keeps broadcasts in-process
+    SOCKETIO_MESSAGE_QUEUE: Optional[str] = os.getenv("SOCKETIO_MESSAGE_QUEUE") or None
 
-    LOG_LEVEL = "INFO"
+    # ==================== Database Settings ====================
+    # Size the pool for concurrent request threads plus the background writers
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 20))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 10))  # seconds to wait for a free connection
 
     # ==================== Camera Control Settings ====================
     # Tapo Camera Configuration
-    CAMERA_HOST = os.getenv("CAMERA_HOST", "192.168.1.100")  # Camera IP address
-    CAMERA_USERNAME = os.getenv("CAMERA_USERNAME")
-    CAMERA_PASSWORD = os.getenv("CAMERA_PASSWORD")
-    CAMERA_ENABLED = os.getenv("CAMERA_ENABLED", "false").lower() == "true"
+    CAMERA_HOST: str = os.getenv("CAMERA_HOST", "192.168.1.100")  # Camera IP address
+    CAMERA_USERNAME: Optional[str] = os.getenv("CAMERA_USERNAME")
+    CAMERA_PASSWORD: Optional[str] = os.getenv("CAMERA_PASSWORD")
+    CAMERA_ENABLED: bool = os.getenv("CAMERA_ENABLED", "false").lower() == "true"
+    CAMERA_INFO_TIMEOUT_SEC: float = float(os.getenv("CAMERA_INFO_TIMEOUT_SEC", 0.5))  # max wait before serving last-known info
+    CAMERA_INFO_FIRST_TIMEOUT_SEC: float = float(os.getenv("CAMERA_INFO_FIRST_TIMEOUT_SEC", 5.0))  # max wait when nothing is cached yet
+    CAMERA_STATUS_TTL_SEC: float = float(os.getenv("CAMERA_STATUS_TTL_SEC", 2.0))  # reuse camera status between polls for this long
+    CAMERA_RETRY_BACKOFF_SEC: float = float(os.getenv("CAMERA_RETRY_BACKOFF_SEC", 30.0))  # wait before reconnecting after a failure
 
 
 # Create global config instance
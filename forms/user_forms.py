@@ -1,10 +1,75 @@
 """
 WTForms for user authentication
 """
+import time
+import threading
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, BooleanField, SubmitField, SelectField
 from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError
-from models.auth import User
+from sqlalchemy import or_
+from models.auth import User, db
+
+# Shared SelectField choices (immutable, built once per process)
+RELATIONSHIP_CHOICES = (
+    ('Father', 'Father'), ('Mother', 'Mother'),
+    ('Guardian', 'Guardian'), ('Grandparent', 'Grandparent'),
+    ('Babysitter', 'Babysitter'), ('Other', 'Other'),
+)
+STATUS_CHOICES = (('1', 'Active'), ('0', 'Inactive'))
+
+USER_LOOKUP_CACHE_TTL = 30  # seconds a username/email availability result is reused
+USER_LOOKUP_CACHE_SIZE = 512
+
+_user_lookup_cache = {}  # {(username, email): (expires_at, conflicts)}
+_user_lookup_lock = threading.Lock()
+
+def _find_user_conflicts(username, email):
+    """Return which of username/email are taken, cached briefly for repeated checks"""
+    key = (username, email)
+    now = time.monotonic()
+    with _user_lookup_lock:
+        entry = _user_lookup_cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+    
+    rows = db.session.query(User.username, User.email).filter(
+        or_(User.username == username, User.email == email)
+    ).limit(2).all()
+    conflicts = {
+        'username': any(row.username == username for row in rows),
+        'email': any(row.email == email for row in rows),
+    }
+    
+    with _user_lookup_lock:
+        if len(_user_lookup_cache) >= USER_LOOKUP_CACHE_SIZE:
+            _user_lookup_cache.clear()
+        _user_lookup_cache[key] = (now + USER_LOOKUP_CACHE_TTL, conflicts)
+    return conflicts
+
+def clear_user_lookup_cache():
+    """Drop cached availability results (call after users are created, renamed or deleted)"""
+    with _user_lookup_lock:
+        _user_lookup_cache.clear()
+
+class UniqueUserFieldsMixin:
+    """Username/email uniqueness validators backed by a single lookup query"""
+    _conflicts = None
+    
+    def _lookup_conflicts(self):
+        """Return which of username/email are already taken (looked up once per form)"""
+        if self._conflicts is None:
+            self._conflicts = _find_user_conflicts(self.username.data, self.email.data)  # type: ignore[attr-defined]
+        return self._conflicts
+    
+    def validate_username(self, username):
+        """Check if username already exists"""
+        if self._lookup_conflicts()['username']:
+            raise ValidationError('Please use a different username.')
+    
+    def validate_email(self, email):
+        """Check if email already exists"""
+        if self._lookup_conflicts()['email']:
+            raise ValidationError('Please use a different email address.')
 
 class LoginForm(FlaskForm):
     """Login form"""
@@ -13,7 +78,7 @@ class LoginForm(FlaskForm):
     remember_me = BooleanField('Remember Me')
     submit = SubmitField('Sign In')
 
-class SignupForm(FlaskForm):
+class SignupForm(UniqueUserFieldsMixin, FlaskForm):
     """Signup form"""
     username = StringField('Username', validators=[
         DataRequired(), 
@@ -21,9 +86,7 @@ class SignupForm(FlaskForm):
     ])
     email = StringField('Email', validators=[DataRequired(), Email()])
     relationship = SelectField('Relationship to Child', 
-                              choices=[('Father', 'Father'), ('Mother', 'Mother'), 
-                                     ('Guardian', 'Guardian'), ('Grandparent', 'Grandparent'),
-                                     ('Babysitter', 'Babysitter'), ('Other', 'Other')],
+                              choices=RELATIONSHIP_CHOICES,
                               default='Guardian')
     password = PasswordField('Password', validators=[
         DataRequired(), 
@@ -34,18 +97,6 @@ class SignupForm(FlaskForm):
         EqualTo('password', message='Passwords must match')
     ])
     submit = SubmitField('Sign Up')
-    
-    def validate_username(self, username):
-        """Check if username already exists"""
-        user = User.query.filter_by(username=username.data).first()
-        if user is not None:
-            raise ValidationError('Please use a different username.')
-    
-    def validate_email(self, email):
-        """Check if email already exists"""
-        user = User.query.filter_by(email=email.data).first()
-        if user is not None:
-            raise ValidationError('Please use a different email address.')
 
 class ChangePasswordForm(FlaskForm):
     """Change password form for first-time login"""
@@ -65,23 +116,19 @@ class UserManagementForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired(), Length(min=3, max=80)])
     email = StringField('Email', validators=[DataRequired(), Email()])
     relationship = SelectField('Relationship to Child', 
-                              choices=[('Father', 'Father'), ('Mother', 'Mother'), 
-                                     ('Guardian', 'Guardian'), ('Grandparent', 'Grandparent'),
-                                     ('Babysitter', 'Babysitter'), ('Other', 'Other')],
+                              choices=RELATIONSHIP_CHOICES,
                               default='Guardian')
-    active = SelectField('Status', choices=[('1', 'Active'), ('0', 'Inactive')], coerce=str)
+    active = SelectField('Status', choices=STATUS_CHOICES, coerce=str)
     is_admin = BooleanField('Admin User')
     streaming_enabled = BooleanField('Streaming Access', default=True)
     submit = SubmitField('Update User')
 
-class CreateUserForm(FlaskForm):
+class CreateUserForm(UniqueUserFieldsMixin, FlaskForm):
     """Create new user form for admin"""
     username = StringField('Username', validators=[DataRequired(), Length(min=3, max=80)])
     email = StringField('Email', validators=[DataRequired(), Email()])
     relationship = SelectField('Relationship to Child', 
-                              choices=[('Father', 'Father'), ('Mother', 'Mother'), 
-                                     ('Guardian', 'Guardian'), ('Grandparent', 'Grandparent'),
-                                     ('Babysitter', 'Babysitter'), ('Other', 'Other')],
+                              choices=RELATIONSHIP_CHOICES,
                               default='Guardian')
     password = PasswordField('Password', validators=[
         DataRequired(), 
@@ -91,15 +138,3 @@ class CreateUserForm(FlaskForm):
     is_admin = BooleanField('Admin User', default=False)
     streaming_enabled = BooleanField('Streaming Access', default=True)
     submit = SubmitField('Create User')
-    
-    def validate_username(self, username):
-        """Check if username already exists"""
-        user = User.query.filter_by(username=username.data).first()
-        if user is not None:
-            raise ValidationError('Please use a different username.')
-    
-    def validate_email(self, email):
-        """Check if email already exists"""
-        user = User.query.filter_by(email=email.data).first()
-        if user is not None:
-            raise ValidationError('Please use a different email address.')
@@ -0,0 +1,17 @@
+"""
+Gunicorn configuration for AI Baby Monitor
+"""
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8847")
+
+# Keep a single worker process: the AI pipeline, Socket.IO rooms and the
+# active-user tracker all live in process memory. Concurrency comes from
+# threads, which matches SocketIO's async_mode='threading'.
+workers = 1
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 32))
+
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
@@ -1,17 +1,41 @@
 """
 User authentication models for RTSP Recorder application
 """
+import time
+import queue
+import threading
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from sqlalchemy import insert, update, bindparam
 # Import the existing SQLAlchemy instance from notifications
-from models.notification import db
+from models.notification import db, ensure_indexes
+from config.settings import config
+
+# Bounded queue of pending login audit rows, written in batches by a background thread
+login_log_queue = queue.Queue(maxsize=1000)
+LOGIN_LOG_BATCH_SIZE = 100
+LOGIN_LOG_FLUSH_INTERVAL = 0.25  # seconds to let a burst of logins accumulate
+
+_dummy_password_hash = None
+
+def _get_dummy_password_hash():
+    """Hash checked for unknown usernames so failed lookups cost the same as bad passwords"""
+    global _dummy_password_hash
+    if _dummy_password_hash is None:
+        _dummy_password_hash = generate_password_hash('dummy-password', method=config.PASSWORD_HASH_METHOD)
+    return _dummy_password_hash
+
+def _hash_params(password_hash):
+    """Return the method/parameter prefix of a Werkzeug hash (e.g. 'scrypt:32768:8:1')"""
+    return password_hash.split('$', 1)[0]
 
 class User(UserMixin, db.Model):
     """User model for authentication"""
     __tablename__ = 'users'
     
     id = db.Column(db.Integer, primary_key=True)
+    # UNIQUE gives SQLite a B-tree index (sqlite_autoindex_users_*) for these lookups
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
@@ -28,12 +52,40 @@ class User(UserMixin, db.Model):
     
     def set_password(self, password):
         """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, method=config.PASSWORD_HASH_METHOD)
     
     def check_password(self, password):
         """Check password against hash"""
         return check_password_hash(self.password_hash, password)
     
+    def needs_rehash(self):
+        """Return True if the stored hash was made with a different method or cost"""
+        return _hash_params(self.password_hash) != _hash_params(_get_dummy_password_hash())
+    
+    @classmethod
+    def authenticate(cls, username, password):
+        """Return the user if credentials match, else None (always runs one hash check)"""
+        user = cls.query.filter_by(username=username).first()
+        if user is None:
+            check_password_hash(_get_dummy_password_hash(), password)
+            return None
+        if not user.check_password(password):
+            return None
+        if config.PASSWORD_REHASH_ON_LOGIN and user.needs_rehash():
+            # Upgrade legacy hashes while the plaintext is available
+            try:
+                user.set_password(password)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"[ERROR] Failed to rehash password for {user.username}: {e}")
+        return user
+    
+    @property
+    def login_count(self):
+        """Number of recorded logins, counted in SQL instead of loading the login_logs collection"""
+        return db.session.query(db.func.count(LoginLog.id)).filter(LoginLog.user_id == self.id).scalar()
+    
     def get_id(self):
         """Return user id as string for Flask-Login"""
         return str(self.id)
@@ -66,9 +118,74 @@ class LoginLog(db.Model):
     ip_address = db.Column(db.String(45))  # IPv6 can be up to 45 characters
     user_agent = db.Column(db.Text)
     
+    # Serves the newest-first login log pagination without a sort, and the
+    # per-user lookups behind User.login_logs and its delete-orphan cascade
+    __table_args__ = (
+        db.Index('ix_login_logs_time_desc_user', login_time.desc(), user_id),
+        db.Index('ix_login_logs_user_id', user_id),
+    )
+    
     def __repr__(self):
         return f'<LoginLog {self.user_id} at {self.login_time}>'
 
+def queue_login_log(user_id, login_time, ip_address, user_agent) -> bool:
+    """Queue a login audit row for the background writer; False if the queue is full"""
+    try:
+        login_log_queue.put_nowait((user_id, login_time, ip_address, user_agent))
+        return True
+    except queue.Full:
+        return False
+
+def _write_login_logs(batch):
+    """Insert a batch of login logs and update last_login in one transaction"""
+    rows = []
+    last_logins = {}
+    for user_id, login_time, ip_address, user_agent in batch:
+        rows.append({
+            'user_id': user_id,
+            'login_time': login_time,
+            'ip_address': ip_address,
+            'user_agent': user_agent
+        })
+        if user_id not in last_logins or login_time > last_logins[user_id]:
+            last_logins[user_id] = login_time
+
+    try:
+        db.session.execute(insert(LoginLog.__table__), rows)
+        users = User.__table__
+        db.session.execute(
+            update(users).where(users.c.id == bindparam('uid')).values(last_login=bindparam('ts')),
+            [{'uid': user_id, 'ts': login_time} for user_id, login_time in last_logins.items()]
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"[ERROR] Failed to write login logs: {e}")
+
+def _start_login_log_writer(app):
+    """Start background thread that drains the login log queue in batches"""
+    def process_login_logs():
+        while True:
+            try:
+                batch = [login_log_queue.get(timeout=1.0)]
+            except queue.Empty:
+                continue
+
+            time.sleep(LOGIN_LOG_FLUSH_INTERVAL)
+            while len(batch) < LOGIN_LOG_BATCH_SIZE:
+                try:
+                    batch.append(login_log_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            with app.app_context():
+                _write_login_logs(batch)
+            for _ in batch:
+                login_log_queue.task_done()
+
+    writer_thread = threading.Thread(target=process_login_logs, daemon=True)
+    writer_thread.start()
+
 def init_db(app):
     """Initialize auth database tables and default admin user"""
     # Database is already initialized by notification_manager.init_app(app)
@@ -76,10 +193,11 @@ def init_db(app):
     with app.app_context():
         # Create all tables (including User and LoginLog tables)
         db.create_all()
+        ensure_indexes(LoginLog)
         
         # Create default admin user if not exists
-        admin_user = User.query.filter_by(username='admin').first()
-        if not admin_user:
+        admin_exists = db.session.query(User.query.filter_by(username='admin').exists()).scalar()
+        if not admin_exists:
             admin_user = User()
             admin_user.username = 'admin'
             admin_user.email = 'admin@localhost'
@@ -91,3 +209,5 @@ def init_db(app):
             db.session.add(admin_user)
             db.session.commit()
             print("[INFO] Default admin user created (username: admin, password: password, relationship: Father)")
+
+    _start_login_log_writer(app)
@@ -2,12 +2,14 @@
 Notification model using Flask-SQLAlchemy
 """
 import os
+import time
 import datetime
 import threading
 import queue
 from typing import List, Dict, Optional
+from flask import has_app_context
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import desc, func
+from sqlalchemy import and_, desc, event, func, insert, or_
 from config.settings import config
 
 # Initialize SQLAlchemy instance
@@ -15,8 +17,24 @@ db = SQLAlchemy()
 
 # Thread-safe notification queue for background thread notifications
 notification_queue = queue.Queue()
+NOTIFICATION_BATCH_SIZE = 100
+NOTIFICATION_FLUSH_INTERVAL = 0.02  # seconds to let a burst of notifications accumulate
 _flask_app = None
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL journaling so readers don't block on writers and commits fsync less"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")  # durable enough under WAL
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+def ensure_indexes(model):
+    """Create declared indexes missing from an existing table (create_all skips existing tables)"""
+    for index in model.__table__.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+
 class Notification(db.Model):
     """Notification model for SQLAlchemy"""
     
@@ -29,6 +47,12 @@ class Notification(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     
+    # Range seeks for recent/by-date listings and the per-type listing
+    __table_args__ = (
+        db.Index('ix_notifications_timestamp', timestamp),
+        db.Index('ix_notifications_type_timestamp', type, timestamp),
+    )
+    
     def __repr__(self):
         return f'<Notification {self.id}: {self.title}>'
     
@@ -44,14 +68,33 @@ class Notification(db.Model):
         }
     
     @classmethod
-    def add_notification(cls, title: str, message: str, notification_type: str = 'info') -> Optional['Notification']:
+    def _list_query(cls):
+        """Column-only query for read paths (plain rows, no ORM instances or identity map)"""
+        return db.session.query(cls.id, cls.title, cls.message, cls.type, cls.timestamp, cls.created_at)
+    
+    @staticmethod
+    def _row_to_dict(row) -> Dict:
+        """Convert a _list_query row to the same dict shape as to_dict()"""
+        notification_id, title, message, notification_type, timestamp, created_at = row
+        return {
+            'id': notification_id,
+            'title': title,
+            'message': message,
+            'type': notification_type,
+            'timestamp': timestamp.isoformat() if timestamp else None,
+            'created_at': created_at.isoformat() if created_at else None
+        }
+    
+    @classmethod
+    def add_notification(cls, title: str, message: str, notification_type: str = 'info',
+                         timestamp: Optional[datetime.datetime] = None) -> Optional['Notification']:
         """Add a new notification to the database"""
         try:
             notification = cls(
                 title=title, # type: ignore
                 message=message, # type: ignore
                 type=notification_type, # type: ignore
-                timestamp=datetime.datetime.utcnow() # type: ignore
+                timestamp=timestamp or datetime.datetime.utcnow() # type: ignore
             )
             
             db.session.add(notification)
@@ -63,11 +106,41 @@ class Notification(db.Model):
             return None
     
     @classmethod
-    def get_recent_notifications(cls, limit: int = 20) -> List[Dict]:
-        """Get recent notifications from the database"""
+    def add_notifications(cls, batch: List[tuple]) -> int:
+        """Insert (title, message, type, timestamp) tuples in one transaction; falls back to row-by-row"""
+        now = datetime.datetime.utcnow()
         try:
-            notifications = cls.query.order_by(cls.timestamp).limit(limit).all()
-            return [notification.to_dict() for notification in notifications]
+            # timestamp is when the event was raised; created_at is when the row was written
+            db.session.execute(insert(cls.__table__), [
+                {'title': title, 'message': message, 'type': notification_type,
+                 'timestamp': timestamp, 'created_at': now}
+                for title, message, notification_type, timestamp in batch
+            ])
+            db.session.commit()
+            return len(batch)
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] Batch notification insert failed, retrying individually: {e}")
+        
+        return sum(1 for title, message, notification_type, timestamp in batch
+                   if cls.add_notification(title, message, notification_type, timestamp))
+    
+    @classmethod
+    def get_recent_notifications(cls, limit: int = 20, before_ts: Optional[datetime.datetime] = None,
+                                 before_id: Optional[int] = None) -> List[Dict]:
+        """Get the most recent notifications (oldest first), optionally before the (before_ts, before_id) cursor"""
+        try:
+            query = cls._list_query()
+            if before_ts is not None:
+                # Keyset cursor matching the (timestamp, id) sort; rows from one batch share a timestamp
+                if before_id is None:
+                    query = query.filter(cls.timestamp < before_ts)
+                else:
+                    query = query.filter(or_(cls.timestamp < before_ts,
+                                             and_(cls.timestamp == before_ts, cls.id < before_id)))
+            # Newest rows via a backward index scan, returned in chronological order
+            notifications = query.order_by(desc(cls.timestamp), desc(cls.id)).limit(limit).all()
+            return [cls._row_to_dict(row) for row in reversed(notifications)]
         except Exception as e:
             print(f"[ERROR] Failed to get notifications: {e}")
             return []
@@ -76,12 +149,12 @@ class Notification(db.Model):
     def get_notifications_by_type(cls, notification_type: str, limit: int = 20) -> List[Dict]:
         """Get notifications filtered by type"""
         try:
-            notifications = (cls.query
-                           .filter_by(type=notification_type)
+            notifications = (cls._list_query()
+                           .filter(cls.type == notification_type)
                            .order_by(desc(cls.timestamp))
                            .limit(limit)
                            .all())
-            return [notification.to_dict() for notification in notifications]
+            return [cls._row_to_dict(row) for row in notifications]
         except Exception as e:
             print(f"[ERROR] Failed to get notifications by type: {e}")
             return []
@@ -90,13 +163,15 @@ class Notification(db.Model):
     def get_notifications_by_date(cls, date: str, limit: int = 50) -> List[Dict]:
         """Get notifications for a specific date (YYYY-MM-DD)"""
         try:
-            target_date = datetime.datetime.strptime(date, '%Y-%m-%d').date()
-            notifications = (cls.query
-                           .filter(func.date(cls.timestamp) == target_date)
+            # Compare against day bounds rather than date(timestamp) so the index is used
+            day_start = datetime.datetime.strptime(date, '%Y-%m-%d')
+            day_end = day_start + datetime.timedelta(days=1)
+            notifications = (cls._list_query()
+                           .filter(cls.timestamp >= day_start, cls.timestamp < day_end)
                            .order_by(desc(cls.timestamp))
                            .limit(limit)
                            .all())
-            return [notification.to_dict() for notification in notifications]
+            return [cls._row_to_dict(row) for row in notifications]
         except Exception as e:
             print(f"[ERROR] Failed to get notifications by date: {e}")
             return []
@@ -175,7 +250,11 @@ class NotificationManager:
         db.init_app(app)
         
         with app.app_context():
+            # Register before the first connection so every pooled connection gets the pragmas
+            if db.engine.dialect.name == 'sqlite':
+                event.listen(db.engine, 'connect', _set_sqlite_pragmas)
             db.create_all()
+            ensure_indexes(Notification)
             
         # Start background processor for queued notifications
         NotificationManager._start_background_processor()
@@ -187,19 +266,28 @@ class NotificationManager:
             while True:
                 try:
                     # Get notification from queue (blocking)
-                    notification_data = notification_queue.get(timeout=1.0)
-                    
+                    batch = [notification_queue.get(timeout=1.0)]
+                except queue.Empty:
+                    continue
+                
+                # Drain whatever else is pending so a burst commits once
+                time.sleep(NOTIFICATION_FLUSH_INTERVAL)
+                while len(batch) < NOTIFICATION_BATCH_SIZE:
+                    try:
+                        batch.append(notification_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                
+                try:
                     # Process within Flask app context
                     if _flask_app:
                         with _flask_app.app_context():
-                            title, message, notification_type = notification_data
-                            Notification.add_notification(title, message, notification_type)
-                    
-                    notification_queue.task_done()
-                except queue.Empty:
-                    continue
+                            Notification.add_notifications(batch)
                 except Exception as e:
                     print(f"[ERROR] Background notification processing failed: {e}")
+                finally:
+                    for _ in batch:
+                        notification_queue.task_done()
         
         processor_thread = threading.Thread(target=process_notifications, daemon=True)
         processor_thread.start()
@@ -213,26 +301,38 @@ class NotificationManager:
     @staticmethod
     def add_notification_safe(title: str, message: str, notification_type: str = 'info') -> Optional[int]:
         """Thread-safe method to add notification from any thread"""
-        try:
-            # If we're in Flask app context, add directly
-            if _flask_app and _flask_app.app_context:
+        if config.NOTIFICATION_GROUP_COMMIT:
+            # Write-behind: the background processor commits bursts together
+            return NotificationManager._enqueue(title, message, notification_type)
+        
+        # Only request/app-context callers can use the session directly; worker
+        # threads (detector, monitors) go straight to the background queue
+        if has_app_context():
+            try:
                 return NotificationManager.add_notification(title, message, notification_type)
-        except RuntimeError:
-            # Not in app context, queue for background processing
-            pass
+            except RuntimeError:
+                pass
         
         # Queue for background processing
+        return NotificationManager._enqueue(title, message, notification_type)
+    
+    @staticmethod
+    def _enqueue(title: str, message: str, notification_type: str) -> Optional[int]:
+        """Queue a notification for the background processor"""
         try:
-            notification_queue.put((title, message, notification_type), timeout=1.0)
+            # Never block the caller (often the frame-processing thread)
+            # Stamp now, so batched rows keep the time the event was raised, not the flush time
+            notification_queue.put_nowait((title, message, notification_type, datetime.datetime.utcnow()))
             return 1  # Return dummy ID to indicate success
         except queue.Full:
             print(f"[ERROR] Notification queue is full, dropping notification: {title}")
             return None
     
     @staticmethod
-    def get_recent_notifications(limit: int = 20) -> List[Dict]:
+    def get_recent_notifications(limit: int = 20, before_ts: Optional[datetime.datetime] = None,
+                                 before_id: Optional[int] = None) -> List[Dict]:
         """Get recent notifications"""
-        return Notification.get_recent_notifications(limit)
+        return Notification.get_recent_notifications(limit, before_ts, before_id)
     
     @staticmethod
     def clear_all_notifications() -> bool:
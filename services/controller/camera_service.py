@@ -2,10 +2,19 @@
 Camera Service Layer - Handles camera operations and abstracts camera controller logic
 """
 import logging
+import threading
+import time
 from typing import Dict, List, Optional, Any
 from services.controller.tapo_camera import TapoCameraController
 from config.settings import config
 
+# Presets shown when the camera is unavailable or reports none
+_DEFAULT_PRESETS = (
+    {'id': 1, 'name': 'Home Position'},
+    {'id': 2, 'name': 'Sleep Area'},
+    {'id': 3, 'name': 'Play Area'},
+)
+
 
 class CameraService:
     """Service layer for camera operations with proper separation of concerns."""
@@ -13,21 +22,39 @@ class CameraService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self._controller = None
+        self._controller_lock = threading.Lock()
+        self._controller_failed_ts = float('-inf')  # monotonic time of the last failed connect
         self._is_enabled = config.CAMERA_ENABLED
         self._host = config.CAMERA_HOST
         self._username = config.CAMERA_USERNAME
         self._password = config.CAMERA_PASSWORD
+        self._status_cache = None
+        self._status_cache_ts = 0.0
+        self._status_ttl = config.CAMERA_STATUS_TTL_SEC
     
     def _get_controller(self):
         """Get or create camera controller instance."""
         if not self._is_enabled:
             return None
+        
+        # Fast path once the controller exists; no lock needed to read the reference
+        controller = self._controller
+        if controller is not None:
+            return controller
+        
+        with self._controller_lock:
+            if self._controller is not None:
+                return self._controller
+            
+            # Back off after a failed connect instead of re-handshaking on every call
+            if time.monotonic() - self._controller_failed_ts < config.CAMERA_RETRY_BACKOFF_SEC:
+                return None
             
-        if self._controller is None:
             try:
                 # Ensure we have valid credentials
                 if not self._host or not self._username or not self._password:
                     self.logger.error("Camera credentials not properly configured")
+                    self._controller_failed_ts = time.monotonic()
                     return None
                     
                 self._controller = TapoCameraController(
@@ -39,8 +66,9 @@ class CameraService:
                 self.logger.info("Camera controller initialized successfully")
             except Exception as e:
                 self.logger.error(f"Failed to initialize camera controller: {e}")
+                self._controller_failed_ts = time.monotonic()
                 return None
-        return self._controller
+            return self._controller
     
     def is_available(self) -> bool:
         """Check if camera service is available."""
@@ -67,7 +95,12 @@ class CameraService:
                 'connection_status': 'offline'
             }
         
+        now = time.monotonic()
+        if self._status_cache is not None and now - self._status_cache_ts < self._status_ttl:
+            return self._status_cache
+        
         try:
+            # Sequential on purpose: the pytapo client is not safe for concurrent requests
             basic_info = controller.get_basic_info()
             privacy_mode = controller.get_privacy_mode()
             
@@ -81,10 +114,11 @@ class CameraService:
             # Extract device model from various possible fields
             device_model = 'Unknown'
             if isinstance(basic_info, dict):
-                device_model = basic_info.get('device_info').get('basic_info').get('device_alias')
+                device_info = basic_info.get('device_info') or {}
+                device_model = (device_info.get('basic_info') or {}).get('device_alias', 'Unknown')
             self.logger.info(f"Camera status: available=True, privacy_mode={privacy_mode}, device_model={device_model}")
             
-            return {
+            status = {
                 'available': True,
                 'reason': 'connected',
                 'device_model': device_model,
@@ -93,7 +127,7 @@ class CameraService:
             }
         except Exception as e:
             self.logger.error(f"Error getting camera status: {e}")
-            return {
+            status = {
                 'available': False,
                 'reason': 'error',
                 'device_model': 'Error',
@@ -101,17 +135,21 @@ class CameraService:
                 'connection_status': 'error',
                 'error': str(e)
             }
+        
+        self._status_cache = status
+        self._status_cache_ts = now
+        return status
+    
+    def invalidate_status(self) -> None:
+        """Drop the cached status so the next poll reads the camera again."""
+        self._status_cache = None
     
     def get_presets(self) -> List[Dict[str, Any]]:
         """Get formatted list of camera presets."""
         controller = self._get_controller()
         if not controller:
             # Return default presets when camera is not available
-            return [
-                {'id': 1, 'name': 'Home Position'},
-                {'id': 2, 'name': 'Sleep Area'},
-                {'id': 3, 'name': 'Play Area'}
-            ]
+            return list(_DEFAULT_PRESETS)
         
         try:
             presets = controller.get_presets()
@@ -122,19 +160,12 @@ class CameraService:
                 # Handle the case where presets is a list with objects containing id-name pairs
                 for preset_data in presets:
                     if isinstance(preset_data, dict):
-                        # Check if it's the format: {"1": "Bed", "2": "Gate", "3": "back"}
-                        for preset_id, preset_name in preset_data.items():
-                            try:
-                                formatted_presets.append({
-                                    'id': int(preset_id),
-                                    'name': preset_name
-                                })
-                            except (ValueError, TypeError):
-                                # Fallback if preset_id is not a number
-                                formatted_presets.append({
-                                    'id': preset_id,
-                                    'name': preset_name
-                                })
+                        # Format: {"1": "Bed", "2": "Gate", "3": "back"}; non-numeric ids are kept as-is
+                        formatted_presets.extend(
+                            {'id': int(preset_id) if isinstance(preset_id, str) and preset_id.isdigit() else preset_id,
+                             'name': preset_name}
+                            for preset_id, preset_name in preset_data.items()
+                        )
                     else:
                         # Handle other formats
                         formatted_presets.append({
@@ -144,22 +175,14 @@ class CameraService:
             
             # If no presets were found or parsed, use default presets
             if not formatted_presets:
-                formatted_presets = [
-                    {'id': 1, 'name': 'Home Position'},
-                    {'id': 2, 'name': 'Sleep Area'},
-                    {'id': 3, 'name': 'Play Area'}
-                ]
+                formatted_presets = list(_DEFAULT_PRESETS)
             
             return formatted_presets
             
         except Exception as e:
             self.logger.error(f"Error getting presets: {e}")
             # Return default presets on error
-            return [
-                {'id': 1, 'name': 'Home Position'},
-                {'id': 2, 'name': 'Sleep Area'},
-                {'id': 3, 'name': 'Play Area'}
-            ]
+            return list(_DEFAULT_PRESETS)
 
 
 class CameraControlService:
@@ -198,6 +221,7 @@ class CameraControlService:
         try:
             success = controller.set_privacy_mode(enabled)
             if success:
+                self.camera_service.invalidate_status()
                 return {
                     'success': True,
                     'privacy_mode': enabled,
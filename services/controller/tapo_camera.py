@@ -1,15 +1,24 @@
 import os
 import json
 import logging
+import threading
+import time
 from datetime import datetime
 from typing import Dict, List, Optional, Union
 from pytapo import Tapo
 
+# String values the camera uses for an enabled privacy mode
+_TRUE_SET = frozenset(('on', 'true', '1', 'enabled'))
+
 
 class TapoCameraController:
     """
     A comprehensive controller for TP-Link Tapo cameras with extensive functionality.
     """
+
+    # Idle time after which the pooled HTTPS session is dropped; routers often
+    # silently close idle NAT entries, leaving a dead keep-alive socket behind
+    SESSION_IDLE_RESET_SEC = 60.0
     
     def __init__(self, host: str, username: str, password: str, debug: bool = False):
         """
@@ -25,24 +34,41 @@ class TapoCameraController:
         self.username = username
         self.password = password
         
-        # Setup logging
-        logging.basicConfig(
-            level=logging.DEBUG if debug else logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        # Logging is configured once by the application entry point
         self.logger = logging.getLogger(__name__)
+        if debug:
+            self.logger.setLevel(logging.DEBUG)
+        
+        # pytapo mutates shared headers, its seq counter and the pooled session on
+        # every request, so all calls on this client are serialized
+        self._rpc_lock = threading.Lock()
         
         try:
-            self.camera = Tapo(host, username, password)
+            # Reuse one keep-alive session instead of a new TLS handshake per request
+            self.camera = Tapo(host, username, password, reuseSession=True)
+            self._last_rpc_ts = time.monotonic()
             self.logger.info(f"Successfully connected to camera at {host}")
         except Exception as e:
             self.logger.error(f"Failed to connect to camera: {e}")
             raise
     
+    def _call(self, method, *args):
+        """Run one pytapo call under the controller lock, dropping the pooled session if it sat idle too long."""
+        with self._rpc_lock:
+            if time.monotonic() - self._last_rpc_ts > self.SESSION_IDLE_RESET_SEC:
+                session = getattr(self.camera, 'session', False)
+                if session:
+                    session.close()
+                    self.camera.session = False  # pytapo recreates it on the next request
+            try:
+                return method(*args)
+            finally:
+                self._last_rpc_ts = time.monotonic()
+
     def get_basic_info(self) -> Dict:
         """Get basic camera information."""
         try:
-            info = self.camera.getBasicInfo()
+            info = self._call(self.camera.getBasicInfo)
             # Ensure we return a dict even if the API returns something else
             return info if isinstance(info, dict) else {"data": info}
         except Exception as e:
@@ -60,7 +86,7 @@ class TapoCameraController:
             bool: Success status
         """
         try:
-            self.camera.setPrivacyMode(enabled)
+            self._call(self.camera.setPrivacyMode, enabled)
             status = "enabled" if enabled else "disabled"
             self.logger.info(f"Privacy mode {status}")
             return True
@@ -71,7 +97,7 @@ class TapoCameraController:
     def get_privacy_mode(self) -> Optional[bool]:
         """Get current privacy mode status."""
         try:
-            status = self.camera.getPrivacyMode()
+            status = self._call(self.camera.getPrivacyMode)
             self.logger.info(f"Raw privacy mode status: {status}")
             
             # Handle different response formats
@@ -79,7 +105,7 @@ class TapoCameraController:
                 enabled_value = status.get('enabled', 'off')
                 # Convert string values to boolean
                 if isinstance(enabled_value, str):
-                    return enabled_value.lower() in ['on', 'true', '1', 'enabled']
+                    return enabled_value.lower() in _TRUE_SET
                 elif isinstance(enabled_value, bool):
                     return enabled_value
                 elif isinstance(enabled_value, int):
@@ -110,7 +136,7 @@ class TapoCameraController:
             bool: Success status
         """
         try:
-            self.camera.setPreset(preset_id)
+            self._call(self.camera.setPreset, preset_id)
             self.logger.info(f"Set camera to preset {preset_id}")
             return True
         except Exception as e:
@@ -120,7 +146,7 @@ class TapoCameraController:
     def get_presets(self) -> List[Dict]:
         """Get list of available presets."""
         try:
-            presets = self.camera.getPresets()
+            presets = self._call(self.camera.getPresets)
             self.logger.info(f"Retrieved presets")
             # Handle different return types
             if isinstance(presets, list):
@@ -136,7 +162,7 @@ class TapoCameraController:
     def trigger_alarm(self, duration: int = 10) -> bool:
         try:
             # setAlarm typically takes (enabled, soundEnabled) parameters
-            self.camera.setAlarm(True, True)
+            self._call(self.camera.setAlarm, True, True)
             self.logger.info(f"Triggered alarm")
             return True
         except Exception as e:
@@ -146,7 +172,7 @@ class TapoCameraController:
     def reboot_camera(self) -> bool:
         """Reboot the camera."""
         try:
-            self.camera.reboot()
+            self._call(self.camera.reboot)
             self.logger.info("Camera reboot initiated")
             return True
         except Exception as e:
@@ -3,6 +3,9 @@ YOLO detection module for object detection
 """
 import os
 import time
+import threading
+import cv2
+import numpy as np
 import torch
 from ultralytics import YOLO
 
@@ -12,6 +15,21 @@ from services.detection.base_detector import BaseDetector
 class YOLODetector(BaseDetector):
     """YOLO object detection wrapper with bed/person filtering and caching"""
     
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    # Ultralytics export format -> path suffix it writes next to the .pt weights
+    _EXPORT_SUFFIXES = {'openvino': '_openvino_model', 'onnx': '.onnx'}
+    
+    @classmethod
+    def get_instance(cls, classes=('person', 'bed')):
+        """Return the shared detector, loading the model only once per process"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(classes)
+        return cls._instance
+    
     def __init__(self, classes=('person', 'bed')):
         """Initialize YOLO model
         Args:
@@ -21,12 +39,18 @@ class YOLODetector(BaseDetector):
         torch.cuda.is_available = lambda: False  # type: ignore
         self.device = 'cpu'
         print("[INFO] Forced PyTorch to use CPU only")
+        self._configure_torch_threads()
 
         # Load YOLO model (robust fallback if path missing)
         model_path = config.YOLO_MODEL_PATH
         if not os.path.exists(model_path):
             print(f"[WARN] Model path not found: {model_path}. Falling back to model name {config.YOLO_MODEL_NAME}")
             model_path = config.YOLO_MODEL_NAME
+        if config.YOLO_QUANTIZED:
+            model_path = self._quantized_model_path(model_path)
+        if model_path.endswith('.pt') and config.YOLO_BACKEND in self._EXPORT_SUFFIXES:
+            model_path = self._exported_model_path(model_path, config.YOLO_BACKEND)
+        self.is_pytorch_model = model_path.endswith('.pt')
         try:
             t0 = time.perf_counter()
             self.model = YOLO(model_path)
@@ -34,19 +58,24 @@ class YOLODetector(BaseDetector):
             print(f"[INFO] YOLO model loaded from '{model_path}' in {load_ms:.1f} ms")
         except Exception as e:  # pragma: no cover
             raise RuntimeError(f"Failed to load YOLO model: {e}")
-        self.model.to('cpu')
+        if self.is_pytorch_model:
+            # Exported backends (OpenVINO/ONNX) pick their own device and reject .to()
+            self.model.to('cpu')
         print(f"[INFO] YOLOv8 model loaded on CPU device")
         print(f"[INFO] Using YOLO model: {model_path} (CPU-only mode)")
 
         # Class filtering setup
-        # Ultralytics stores names in model.model.names (dict[int,str])
-        raw_names = getattr(self.model.model, 'names', {})  # type: ignore[attr-defined]
+        # Model.names works for PyTorch weights and exported backends alike (dict[int,str])
+        raw_names = getattr(self.model, 'names', {})  # type: ignore[attr-defined]
         if isinstance(raw_names, dict):
             self.class_name_map = raw_names
         else:
             # Fallback if list-like
             self.class_name_map = {i: n for i, n in enumerate(list(raw_names))}
         self.inv_name_map = {v: k for k, v in self.class_name_map.items()}
+        # Class id -> label by tuple index; no dict hashing or int() per box in detect()
+        max_id = max(self.class_name_map, default=-1)
+        self.label_array = tuple(self.class_name_map.get(i, str(i)) for i in range(max_id + 1))
 
         self.target_class_ids = []
         for cname in classes:
@@ -60,8 +89,12 @@ class YOLODetector(BaseDetector):
         else:
             print(f"[INFO] Filtering classes: {[self.class_name_map[c] for c in self.target_class_ids]}")
 
-        # Bed class id (may be None if model lacks 'bed')
-        self.bed_class_id = self.inv_name_map.get('bed')
+        # Bed/person class ids (-1 if the model lacks them, so integer compares never match)
+        self.bed_class_id = self.inv_name_map.get('bed', -1)
+        self.person_class_id = self.inv_name_map.get('person', -1)
+        # Class filter for frames where the cached bed is still valid; keeps NMS work to the other classes
+        self.classes_without_bed = [c for c in self.target_class_ids or () if c != self.bed_class_id] \
+            or self.target_class_ids
 
         # Bed detection caching
         self.cached_bed_box = None
@@ -70,9 +103,115 @@ class YOLODetector(BaseDetector):
         self.bed_redetect_interval = 7200  # frames
         self.frames_since_bed_detection = 0
 
+        # Inference input size; frames are pre-resized so the long side matches it
+        self.imgsz = config.YOLO_IMGSZ
+
+        # Per-frame-size constants: {(h, w): (scale, resized (w, h) or None, bed shift threshold)}
+        self._shape_cache = {}
+
+        # Safe-zone rectangle derived from the cached bed box
+        self._expanded_bed = None
+        self._expanded_bed_key = None
+
+        # Frame-difference gate state (thumbnail of the last analysed frame and its result)
+        self._last_thumb = None
+        self._last_result = None
+        self._frames_since_full_detect = 0
+
         # Performance metrics
         self.last_inference_ms = 0.0
 
+        if config.YOLO_TORCH_COMPILE and self.is_pytorch_model:
+            self._compile_model()
+        if config.YOLO_WARMUP:
+            self._warm_up()
+
+    @staticmethod
+    def _configure_torch_threads():
+        """Size torch's CPU thread pools so inference leaves cores for capture and the web server"""
+        num_threads = config.YOLO_TORCH_THREADS or max(1, (os.cpu_count() or 2) // 2)
+        torch.set_num_threads(num_threads)
+        try:
+            # Only allowed before any inter-op parallel work has started
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+        torch.backends.mkldnn.enabled = True
+        # Denormal floats take a slow microcode path on x86; flushing them to zero is harmless for inference
+        torch.set_flush_denormal(True)
+        print(f"[INFO] Torch CPU threads: {torch.get_num_threads()}")
+
+    @staticmethod
+    def _quantized_model_path(model_path):
+        """Return the INT8 OpenVINO export next to the .pt weights, or model_path if missing"""
+        stem, ext = os.path.splitext(model_path)
+        if ext != '.pt':
+            return model_path
+        quantized_path = f"{stem}_int8_openvino_model"
+        if os.path.isdir(quantized_path):
+            print(f"[INFO] Using INT8 OpenVINO model: {quantized_path}")
+            return quantized_path
+        print(f"[WARN] YOLO_QUANTIZED is set but {quantized_path} was not found; "
+              f"export it once with YOLO('{model_path}').export(format='openvino', int8=True)")
+        return model_path
+
+    @classmethod
+    def _exported_model_path(cls, model_path, backend):
+        """Return the FP32 export for backend next to the .pt weights, exporting it on first use"""
+        exported_path = os.path.splitext(model_path)[0] + cls._EXPORT_SUFFIXES[backend]
+        if not os.path.exists(exported_path):
+            if not os.path.exists(model_path):
+                print(f"[WARN] Cannot export {model_path} to {backend}: weights not found locally")
+                return model_path
+            try:
+                t0 = time.perf_counter()
+                YOLO(model_path).export(format=backend, imgsz=config.YOLO_IMGSZ, half=False)
+                print(f"[INFO] Exported YOLO model to {exported_path} in {time.perf_counter() - t0:.1f} s")
+            except Exception as e:
+                print(f"[WARN] YOLO {backend} export failed, using PyTorch weights: {e}")
+                return model_path
+        print(f"[INFO] Using {backend} YOLO model: {exported_path}")
+        return exported_path
+
+    def _compile_model(self):
+        """Wrap the fused PyTorch network in torch.compile; stays in eager mode if compilation fails"""
+        dummy = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+
+        def run_dummy():
+            with torch.inference_mode():
+                self.model.predict(dummy, verbose=False, device='cpu', imgsz=self.imgsz,
+                                   classes=self.target_class_ids)
+
+        try:
+            # The first predict() builds Ultralytics' backend around the fused module
+            run_dummy()
+            backend = self.model.predictor.model  # type: ignore[union-attr]
+            eager_module = backend.model
+            backend.model = torch.compile(eager_module)
+            t0 = time.perf_counter()
+            try:
+                # Compilation is lazy; pay for it here rather than on the first camera frame
+                run_dummy()
+                run_dummy()
+            except Exception:
+                backend.model = eager_module
+                raise
+            print(f"[INFO] torch.compile finished in {time.perf_counter() - t0:.1f} s")
+        except Exception as e:
+            print(f"[WARN] torch.compile unavailable, using eager PyTorch: {e}")
+
+    def _warm_up(self):
+        """Run one dummy inference so the first real frame doesn't pay for lazy init"""
+        try:
+            t0 = time.perf_counter()
+            dummy = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+            with torch.inference_mode():
+                self.model.predict(dummy, conf=0.5, verbose=False, device='cpu', imgsz=self.imgsz,
+                                   classes=self.target_class_ids)
+            print(f"[INFO] YOLO warm-up inference took {(time.perf_counter() - t0) * 1000:.1f} ms")
+        except Exception as e:
+            print(f"[WARN] YOLO warm-up failed: {e}")
+
     def update_confidence(self, conf: float):
         """Update runtime confidence threshold"""
         conf = max(0.01, min(conf, 0.99))
@@ -87,21 +226,51 @@ class YOLODetector(BaseDetector):
         if frame is None:
             return [], self.cached_bed_box, [], [], None
 
+        # Static scene gate: reuse the last result while the frame barely changes.
+        # Compared against the last analysed frame so slow drift still triggers inference.
+        thumb = cv2.resize(frame, (64, 64), interpolation=cv2.INTER_AREA)
+        bed_pending = config.USE_BED_SAFE_ZONE and self.bed_class_id >= 0 and (
+            self.cached_bed_box is None or
+            self.frames_since_bed_detection >= self.bed_redetect_interval
+        )
+        if (self._last_result is not None and not bed_pending and
+                self._frames_since_full_detect < config.FORCE_DETECT_INTERVAL and
+                np.abs(thumb.astype(np.int16) - self._last_thumb).mean() < config.MOTION_GATE_THRESHOLD):
+            self._frames_since_full_detect += 1
+            self.frames_since_bed_detection += 1
+            return self._last_result
+
+        self._last_thumb = thumb
+        self._frames_since_full_detect = 0
+        self._last_result = self._detect_frame(frame)
+        return self._last_result
+
+    def _detect_frame(self, frame):
+        """Run YOLO on a frame and build the detect() result tuple"""
         should_detect_bed = (
             self.cached_bed_box is None or
             self.frames_since_bed_detection >= self.bed_redetect_interval
         )
         self.frames_since_bed_detection += 1
 
+        # Downscale to the model input size first so YOLO's preprocessing
+        # touches ~imgsz^2 pixels instead of the full camera frame
+        scale, input_size, diff_threshold = self._frame_constants(frame.shape[:2])
+        if input_size is not None:
+            model_input = cv2.resize(frame, input_size, interpolation=cv2.INTER_LINEAR)
+        else:
+            model_input = frame
+
         # Inference
         t0 = time.perf_counter()
-        with torch.no_grad():
+        with torch.inference_mode():
             results = self.model.predict(
-                frame,
+                model_input,
                 conf=config.CONFIDENCE_THRESHOLD,
                 verbose=False,
                 device='cpu',
-                classes=self.target_class_ids
+                imgsz=self.imgsz,
+                classes=self.target_class_ids if should_detect_bed else self.classes_without_bed
             )
         self.last_inference_ms = (time.perf_counter() - t0) * 1000
 
@@ -110,14 +279,11 @@ class YOLODetector(BaseDetector):
         res = results[0]
 
         dets = []
-        smallest_area = None
         smallest_det_tlwh = None
         person_detections = []
         all_detections = []
         detected_bed_box = None
 
-        names = getattr(res, 'names', self.class_name_map)
-
         if res.boxes is None or len(res.boxes) == 0:
             # Re-add cached bed if present for visualization
             if self.cached_bed_box is not None:
@@ -128,29 +294,41 @@ class YOLODetector(BaseDetector):
                 })
             return dets, self.cached_bed_box, all_detections, person_detections, smallest_det_tlwh
 
-        # Tensors -> numpy
-        xyxy = res.boxes.xyxy.cpu().numpy()  # type: ignore
-        clss = res.boxes.cls.cpu().numpy().astype(int)  # type: ignore
-        confs = res.boxes.conf.cpu().numpy()  # type: ignore
-
-        # --- Pass 1: Optional bed detection ---
-        if should_detect_bed and config.USE_BED_SAFE_ZONE and self.bed_class_id is not None:
-            for (x1, y1, x2, y2), cls_id, conf in zip(xyxy, clss, confs):
-                label = names.get(int(cls_id), str(cls_id)) if isinstance(names, dict) else names[int(cls_id)]  # type: ignore
-                if label == 'bed':
-                    detected_bed_box = (int(x1), int(y1), int(x2), int(y2))
-                    break
+        # Tensors -> numpy in one transfer; rows are (x1, y1, x2, y2, conf, cls)
+        data = res.boxes.data.cpu().numpy()  # type: ignore
+        xyxy = data[:, :4]
+        if scale != 1.0:
+            xyxy = xyxy / scale  # back to full-frame coordinates
+        confs = data[:, 4]
+        clss = data[:, 5].astype(np.int32)
+
+        # --- Single pass: collect all detections and the first (highest-confidence) bed ---
+        look_for_bed = should_detect_bed and config.USE_BED_SAFE_ZONE and self.bed_class_id >= 0
+        bed_class_id = self.bed_class_id
+        bed_emitted = False
+        label_array = self.label_array
+        # tolist() converts to Python ints/floats in bulk instead of per-scalar int()/float()
+        for (x1, y1, x2, y2), cls_id, conf in zip(xyxy.astype(np.int32).tolist(), clss.tolist(), confs.tolist()):
+            box = (x1, y1, x2, y2)
+            all_detections.append({
+                'bbox': box,
+                'class': label_array[cls_id],
+                'confidence': conf
+            })
+            if cls_id == bed_class_id:
+                bed_emitted = True
+                if look_for_bed and detected_bed_box is None:
+                    detected_bed_box = box
+
+        # --- Bed cache update from this frame's candidate ---
+        if look_for_bed:
             if detected_bed_box is not None:
                 if self.cached_bed_box is None:
                     self.bed_detection_frames = 1
                 else:
-                    cx1, cy1, cx2, cy2 = self.cached_bed_box
-                    nx1, ny1, nx2, ny2 = detected_bed_box
-                    diff_threshold = min(frame.shape[0], frame.shape[1]) * 0.1
-                    if (abs(cx1 - nx1) < diff_threshold and
-                        abs(cy1 - ny1) < diff_threshold and
-                        abs(cx2 - nx2) < diff_threshold and
-                        abs(cy2 - ny2) < diff_threshold):
+                    # Largest corner shift; the boxes are 4-tuples of Python ints
+                    max_shift = max(abs(c - n) for c, n in zip(self.cached_bed_box, detected_bed_box))
+                    if max_shift < diff_threshold:
                         self.bed_detection_frames += 1
                     else:
                         self.bed_detection_frames = 1
@@ -164,61 +342,76 @@ class YOLODetector(BaseDetector):
 
         bed_box = self.cached_bed_box
 
-        # --- Pass 2: Collect all detections ---
-        for (x1, y1, x2, y2), cls_id, conf in zip(xyxy, clss, confs):
-            label = names.get(int(cls_id), str(cls_id)) if isinstance(names, dict) else names[int(cls_id)]  # type: ignore
-            all_detections.append({
-                'bbox': (int(x1), int(y1), int(x2), int(y2)),
-                'class': label,
-                'confidence': float(conf)
-            })
+        # --- Person filtering (inside bed if available), vectorized ---
+        person_idx = np.flatnonzero(clss == self.person_class_id)
+        if person_idx.size and bed_box is not None and config.USE_BED_SAFE_ZONE:
+            expanded_x1, expanded_y1, expanded_x2, expanded_y2 = self._expanded_bed_area(bed_box, frame.shape)
+            boxes = xyxy[person_idx]
+            person_center_x = (boxes[:, 0] + boxes[:, 2]) * 0.5
+            person_center_y = (boxes[:, 1] + boxes[:, 3]) * 0.5
+            person_in_bed_area = (
+                (person_center_x >= expanded_x1) & (person_center_x <= expanded_x2) &
+                (person_center_y >= expanded_y1) & (person_center_y <= expanded_y2)
+            )
+            person_idx = person_idx[person_in_bed_area]
 
-        # --- Pass 3: Person filtering (inside bed if available) ---
-        for (x1, y1, x2, y2), cls_id, conf in zip(xyxy, clss, confs):
-            label = names.get(int(cls_id), str(cls_id)) if isinstance(names, dict) else names[int(cls_id)]  # type: ignore
-            if label != 'person':
-                continue
-            person_in_bed_area = True
-            if bed_box is not None and config.USE_BED_SAFE_ZONE:
-                bed_x1, bed_y1, bed_x2, bed_y2 = bed_box
-                person_center_x = (x1 + x2) / 2
-                person_center_y = (y1 + y2) / 2
-                # Margin relative to bed size (fallback to 50px)
-                margin = max(50, int((bed_x2 - bed_x1) * 0.08))
-                expanded_x1 = max(0, bed_x1 - margin)
-                expanded_y1 = max(0, bed_y1 - margin)
-                expanded_x2 = min(frame.shape[1], bed_x2 + margin)
-                expanded_y2 = min(frame.shape[0], bed_y2 + margin)
-                person_in_bed_area = (
-                    expanded_x1 <= person_center_x <= expanded_x2 and
-                    expanded_y1 <= person_center_y <= expanded_y2
-                )
-            if person_in_bed_area:
-                w = max(1, int(x2 - x1))
-                h = max(1, int(y2 - y1))
-                tlwh = [int(x1), int(y1), w, h]
-                dets.append((tlwh, float(conf), 'person'))
-                person_detections.append((tlwh, float(conf), label))
-                area = w * h
-                if config.AUTO_SELECT_SMALLEST and (smallest_area is None or area < smallest_area):
-                    smallest_area = area
-                    smallest_det_tlwh = tlwh
+        if person_idx.size:
+            boxes = xyxy[person_idx]
+            ws = np.maximum(1, (boxes[:, 2] - boxes[:, 0]).astype(int))
+            hs = np.maximum(1, (boxes[:, 3] - boxes[:, 1]).astype(int))
+            for x1, y1, w, h, conf in zip(boxes[:, 0].astype(int).tolist(), boxes[:, 1].astype(int).tolist(),
+                                          ws.tolist(), hs.tolist(), confs[person_idx].tolist()):
+                tlwh = [x1, y1, w, h]
+                dets.append((tlwh, conf, 'person'))
+                person_detections.append((tlwh, conf, 'person'))
+            if config.AUTO_SELECT_SMALLEST:
+                # argmin returns the first minimum, matching the previous strict '<' scan
+                smallest_det_tlwh = dets[int(np.argmin(ws * hs))][0]
 
         # Ensure cached bed appears in outputs
-        if self.cached_bed_box is not None:
-            if not any(det['class'] == 'bed' for det in all_detections):
-                all_detections.append({
-                    'bbox': self.cached_bed_box,
-                    'class': 'bed',
-                    'confidence': 0.95
-                })
+        if self.cached_bed_box is not None and not bed_emitted:
+            all_detections.append({
+                'bbox': self.cached_bed_box,
+                'class': 'bed',
+                'confidence': 0.95
+            })
 
         return dets, self.cached_bed_box, all_detections, person_detections, smallest_det_tlwh
 
+    def _frame_constants(self, frame_hw):
+        """(scale, resized (w, h) or None, bed shift threshold) for a frame size, computed once per size"""
+        consts = self._shape_cache.get(frame_hw)
+        if consts is None:
+            frame_h, frame_w = frame_hw
+            scale = self.imgsz / max(frame_h, frame_w)
+            if scale < 1.0:
+                input_size = (round(frame_w * scale), round(frame_h * scale))
+            else:
+                scale, input_size = 1.0, None
+            consts = self._shape_cache[frame_hw] = (scale, input_size, min(frame_h, frame_w) * 0.1)
+        return consts
+
+    def _expanded_bed_area(self, bed_box, frame_shape):
+        """Bed box grown by a safe-zone margin, recomputed only when the bed or frame size changes"""
+        key = (bed_box, frame_shape[:2])
+        if self._expanded_bed_key != key:
+            bed_x1, bed_y1, bed_x2, bed_y2 = bed_box
+            # Margin relative to bed size (fallback to 50px)
+            margin = max(50, int((bed_x2 - bed_x1) * 0.08))
+            self._expanded_bed = (
+                max(0, bed_x1 - margin),
+                max(0, bed_y1 - margin),
+                min(frame_shape[1], bed_x2 + margin),
+                min(frame_shape[0], bed_y2 + margin),
+            )
+            self._expanded_bed_key = key
+        return self._expanded_bed
+
     def reset_bed_cache(self):
         self.cached_bed_box = None
         self.bed_detection_frames = 0
         self.frames_since_bed_detection = 0
+        self._last_result = None
         print("[BED] Cache reset")
 
     def get_bed_status(self):
@@ -1,80 +1,158 @@
 """
 User activity tracking service for monitoring who is currently watching
 """
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from flask_login import current_user
 from typing import Dict, List, Optional
 import threading
+import time
+from config.settings import config
+
+SNAPSHOT_MAX_AGE = 5.0  # seconds before a cached snapshot is rebuilt even without changes
 
 class UserActivityTracker:
     """Track active users and their session information"""
     
     def __init__(self):
-        self._active_users = {}  # {user_id: {username, relationship, last_seen, session_id}}
+        # {user_id: {username, relationship, last_seen_ts, session_id, is_admin}}, least recently seen first
+        self._active_users = OrderedDict()
+        # Read-only copy republished on structural changes so readers can skip the lock;
+        # entries are shared, so heartbeats stay visible without republishing
+        self._users_view = MappingProxyType({})
+        self._sessions_by_user = {}  # {user_id: {session_id, ...}} for O(1) session lookup
         self._lock = threading.Lock()
+        self._snapshot = None  # cached {'active_users', 'count'} payload
+        self._snapshot_ts = 0.0
     
-    def add_active_user(self, user, session_id: str) -> None:
-        """Add or update an active user"""
+    def add_active_user(self, user, session_id: str) -> Dict:
+        """Add or update an active user and return the stored entry"""
         with self._lock:
             user_id = user.id if user and hasattr(user, 'id') else 'anonymous'
-            self._active_users[user_id] = {
+            self._snapshot = None
+            user_data = self._active_users[user_id] = {
                 'username': user.username if user and hasattr(user, 'username') else 'Anonymous',
                 'relationship': getattr(user, 'relationship', 'Guest') if user else 'Guest',
-                'last_seen': datetime.utcnow(),
+                'last_seen_ts': time.monotonic(),
                 'session_id': session_id,
                 'is_admin': getattr(user, 'is_admin', False) if user else False
             }
+            self._active_users.move_to_end(user_id)
+            self._publish_view()
+            self._sessions_by_user.setdefault(user_id, set()).add(session_id)
+            return user_data
+    
+    def remove_active_user(self, user_id: str, session_id: Optional[str] = None) -> Optional[Dict]:
+        """Remove a user's session (or all sessions) and return the entry once the user is gone"""
+        with self._lock:
+            sessions = self._sessions_by_user.get(user_id)
+            if session_id is not None and sessions:
+                sessions.discard(session_id)
+                if sessions:
+                    # User still has other open sessions; keep them active
+                    user_data = self._active_users.get(user_id)
+                    if user_data is not None and user_data['session_id'] == session_id:
+                        user_data['session_id'] = next(iter(sessions))
+                        self._snapshot = None
+                    return None
+            self._sessions_by_user.pop(user_id, None)
+            user_data = self._active_users.pop(user_id, None)
+            if user_data is not None:
+                self._snapshot = None
+                self._publish_view()
+            return user_data
     
-    def remove_active_user(self, user_id: str) -> None:
-        """Remove a user from active list"""
+    def get_sessions(self, user_id) -> set:
+        """Get the open session ids for a user"""
         with self._lock:
-            if user_id in self._active_users:
-                del self._active_users[user_id]
+            return set(self._sessions_by_user.get(user_id, ()))
     
     def update_last_seen(self, user_id: str) -> None:
-        """Update the last seen timestamp for a user"""
+        """Bump the last seen timestamp for a user (heartbeats do not invalidate the snapshot)"""
+        with self._lock:
+            user_data = self._active_users.get(user_id)
+            if user_data is not None:
+                user_data['last_seen_ts'] = time.monotonic()
+                self._active_users.move_to_end(user_id)
+    
+    def evict_idle_users(self) -> int:
+        """Drop users idle longer than the configured TTL and return how many were removed"""
         with self._lock:
-            if user_id in self._active_users:
-                self._active_users[user_id]['last_seen'] = datetime.utcnow()
+            return self._evict_idle(time.monotonic())
+    
+    def _evict_idle(self, now: float) -> int:
+        """Evict idle entries from the least recently seen end (caller holds the lock)"""
+        threshold = now - config.ACTIVE_USER_IDLE_TTL_SEC
+        evicted = 0
+        while self._active_users:
+            user_id, user_data = next(iter(self._active_users.items()))
+            if user_data['last_seen_ts'] >= threshold:
+                break
+            del self._active_users[user_id]
+            self._sessions_by_user.pop(user_id, None)
+            evicted += 1
+        if evicted:
+            self._snapshot = None
+            self._publish_view()
+        return evicted
+    
+    def _publish_view(self) -> None:
+        """Replace the lock-free read view (caller holds the lock)"""
+        self._users_view = MappingProxyType(dict(self._active_users))
     
     def get_active_users(self) -> List[Dict]:
         """Get list of currently active users"""
+        return list(self.get_snapshot()['active_users'])
+    
+    def _collect_active_users(self) -> List[Dict]:
+        """Build the active users list, most recently seen first (caller holds the lock)"""
+        current_time = datetime.utcnow()
+        now = time.monotonic()
+        
+        active_users = []
+        # Entries are kept in last-seen order, so walking backwards needs no sort
+        for user_id, user_data in reversed(self._active_users.items()):
+            idle = timedelta(seconds=now - user_data['last_seen_ts'])
+            active_users.append({
+                'id': user_id,
+                'user_id': user_id,
+                'username': user_data['username'],
+                'relationship': user_data['relationship'],
+                'last_seen': (current_time - idle).isoformat(),
+                'is_admin': user_data.get('is_admin', False),
+                'session_id': user_data.get('session_id'),
+                'session_duration': str(idle).split('.')[0]
+            })
+        
+        return active_users
+    
+    def get_snapshot(self) -> Dict:
+        """Get the active users broadcast payload, rebuilt only after changes or when stale"""
+        # Fast path: a fresh snapshot is an immutable-by-convention reference, read without the lock
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._snapshot_ts <= SNAPSHOT_MAX_AGE:
+            return snapshot
         with self._lock:
-            current_time = datetime.utcnow()
-            active_threshold = current_time - timedelta(minutes=5)  # 5 minutes timeout
-            
-            active_users = []
-            users_to_remove = []
-            
-            for user_id, user_data in self._active_users.items():
-                if user_data['last_seen'] > active_threshold:
-                    active_users.append({
-                        'id': user_id,
-                        'user_id': user_id,
-                        'username': user_data['username'],
-                        'relationship': user_data['relationship'],
-                        'last_seen': user_data['last_seen'].isoformat(),
-                        'is_admin': user_data.get('is_admin', False),
-                        'session_id': user_data.get('session_id'),
-                        'session_duration': str(current_time - user_data['last_seen']).split('.')[0]
-                    })
-                else:
-                    users_to_remove.append(user_id)
-            
-            # Clean up inactive users
-            for user_id in users_to_remove:
-                del self._active_users[user_id]
-            
-            return sorted(active_users, key=lambda x: x['last_seen'], reverse=True)
+            now = time.monotonic()
+            if self._snapshot is None or now - self._snapshot_ts > SNAPSHOT_MAX_AGE:
+                self._evict_idle(now)
+                active_users = self._collect_active_users()
+                self._snapshot = {'active_users': active_users, 'count': len(active_users)}
+                self._snapshot_ts = now
+            return self._snapshot
     
     def get_active_count(self) -> int:
         """Get count of currently active users"""
-        return len(self.get_active_users())
+        view = self._users_view
+        threshold = time.monotonic() - config.ACTIVE_USER_IDLE_TTL_SEC
+        return sum(1 for user_data in view.values() if user_data['last_seen_ts'] >= threshold)
     
     def is_user_active(self, user_id: str) -> bool:
         """Check if a specific user is currently active"""
-        active_users = self.get_active_users()
-        return any(user['user_id'] == user_id for user in active_users)
+        user_data = self._users_view.get(user_id)
+        return (user_data is not None and
+                time.monotonic() - user_data['last_seen_ts'] <= config.ACTIVE_USER_IDLE_TTL_SEC)
 
 # Global instance
 activity_tracker = UserActivityTracker()
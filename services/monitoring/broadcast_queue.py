@@ -0,0 +1,47 @@
+"""
+Coalescing broadcaster for Socket.IO room updates
+"""
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+class BroadcastCoalescer:
+    """Collect broadcast requests and emit each (event, room) at most once per interval"""
+
+    def __init__(self, socketio, interval: float = 0.1):
+        self.socketio = socketio
+        self.interval = interval
+        self._pending = deque()  # (event, room, payload_builder)
+        self._task = None
+        self._lock = threading.Lock()
+
+    def schedule(self, event: str, payload_builder: Callable[[], Dict], room: Optional[str] = None) -> None:
+        """Queue a broadcast; the payload is built once when the batch is flushed"""
+        self._pending.append((event, room, payload_builder))
+        if self._task is None:
+            self._start()
+
+    def _start(self) -> None:
+        """Start the background flush task once"""
+        with self._lock:
+            if self._task is None:
+                self._task = self.socketio.start_background_task(self._run)
+
+    def _run(self) -> None:
+        """Flush loop: drain pending requests, dedupe by (event, room) and emit once each"""
+        while True:
+            self.socketio.sleep(self.interval)
+            if not self._pending:
+                continue
+
+            batch = {}
+            while self._pending:
+                event, room, payload_builder = self._pending.popleft()
+                batch[(event, room)] = payload_builder
+
+            for (event, room), payload_builder in batch.items():
+                try:
+                    self.socketio.emit(event, payload_builder(), room=room)
+                except Exception as e:
+                    print(f"[ERROR] Broadcast of {event} failed: {e}")
@@ -24,6 +24,9 @@ class SleepMonitor:
         self.child_detected = False  # Track if child is currently detected
         self.frames_without_detection = 0  # Track consecutive frames without detection
         self.max_frames_without_detection = 30  # Allow 30 frames without detection before marking as "No child"
+        self.sleep_time_min = config.SLEEP_TIME_SEC // 60
+        self._movement_threshold_sq = config.MOVEMENT_THRESHOLD ** 2  # compare squared distances, no sqrt
+        self._sleep_time_cache = (-1, "0m")  # (whole minutes asleep, formatted string)
         
     def update(self, child_center):
         """Update sleep monitoring state"""
@@ -54,9 +57,9 @@ class SleepMonitor:
         # Calculate movement from last known position
         movement_detected = False
         if self.child_last_position is not None:
-            distance = ((child_center[0] - self.child_last_position[0]) ** 2 + 
-                       (child_center[1] - self.child_last_position[1]) ** 2) ** 0.5
-            if distance > config.MOVEMENT_THRESHOLD:
+            (cx, cy), (lx, ly) = child_center, self.child_last_position
+            dx, dy = cx - lx, cy - ly
+            if dx * dx + dy * dy > self._movement_threshold_sq:
                 movement_detected = True
                 self.last_movement_time = current_time
                 
@@ -84,7 +87,7 @@ class SleepMonitor:
                     self.child_is_sleeping = True
                     log_line(f"[SLEEP] Child has been stationary for {config.SLEEP_TIME_SEC} seconds")
                     notification_service.dispatch_notification("[SLEEP] Child Sleeping", 
-                          f"Child appears to be sleeping (no movement for {config.SLEEP_TIME_SEC//60}+ minutes)")
+                          f"Child appears to be sleeping (no movement for {self.sleep_time_min}+ minutes)")
             
             elif movement_detected:
                 # Reset stationary timer if movement detected
@@ -129,16 +132,12 @@ class SleepMonitor:
         if not self.enabled or not self.child_detected or not self.child_is_sleeping or self.stationary_start_time is None:
             return "0m"
         
-        current_time = time.time()
-        sleep_duration = current_time - self.stationary_start_time
-        
-        hours = int(sleep_duration // 3600)
-        minutes = int((sleep_duration % 3600) // 60)
-        
-        if hours > 0:
-            return f"{hours}h {minutes}m"
-        else:
-            return f"{minutes}m"
+        # The string only changes once a minute; reformat only when the minute rolls over
+        total_minutes = int((time.time() - self.stationary_start_time) // 60)
+        if total_minutes != self._sleep_time_cache[0]:
+            hours, minutes = divmod(total_minutes, 60)
+            self._sleep_time_cache = (total_minutes, f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m")
+        return self._sleep_time_cache[1]
         
 
 class SafetyMonitor:
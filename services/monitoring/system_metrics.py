@@ -0,0 +1,45 @@
+"""
+Background sampler for host CPU and memory usage
+"""
+import threading
+import psutil
+
+
+class SystemMetricsSampler:
+    """Sample CPU and memory usage in a daemon thread so requests never block on psutil"""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._latest = (0.0, 0.0)  # (cpu_percent, memory_percent)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the sampling thread if it is not already running"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            psutil.cpu_percent(interval=None)  # prime the counter for the first real sample
+            self._latest = (0.0, psutil.virtual_memory().percent)
+            self._thread = threading.Thread(target=self._run, name='system-metrics', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Sampling loop; cpu_percent blocks for the interval, off the request path"""
+        while True:
+            cpu = psutil.cpu_percent(interval=self.interval)
+            self._latest = (cpu, psutil.virtual_memory().percent)
+
+    def get_usage(self):
+        """Return the latest (cpu_percent, memory_percent) sample without blocking"""
+        if self._thread is None:
+            self.start()
+        return self._latest
+
+
+# Global sampler instance
+system_metrics_sampler = SystemMetricsSampler()
+
+def get_system_metrics_sampler() -> SystemMetricsSampler:
+    """Get the global system metrics sampler instance"""
+    return system_metrics_sampler
@@ -11,10 +11,11 @@ class NotificationService:
     def __init__(self):
         self.notification_manager = notification_manager
     
-    def get_recent_notifications(self, limit=20):
+    def get_recent_notifications(self, limit=20, before_ts=None, before_id=None):
         """Get recent notifications for the web interface"""
         try:
-            notifications = self.notification_manager.get_recent_notifications(limit=limit)
+            notifications = self.notification_manager.get_recent_notifications(limit=limit, before_ts=before_ts,
+                                                                               before_id=before_id)
             return True, notifications
         except Exception as e:
             return False, f'Failed to get notifications: {str(e)}'
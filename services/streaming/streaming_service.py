@@ -14,6 +14,7 @@ from services.tracking.deepsort_tracker import DeepSortTracker
 from services.monitoring.monitors import SleepMonitor, SafetyMonitor
 from services.visualization.visualizer import Visualizer
 from services.streaming.rtsp_reader import RTSPReader
+from services.monitoring.system_metrics import get_system_metrics_sampler
 
 
 class FrameMemoryPool:
@@ -144,7 +145,7 @@ class AIBabyMonitorStreamer(threading.Thread):
     def __init__(self, web_stream_manager):
         super().__init__()
         self.web_stream_manager = web_stream_manager
-        self.detector = YOLODetector()
+        self.detector = YOLODetector.get_instance()
         self.tracker = DeepSortTracker()
         self.sleep_monitor = SleepMonitor()
         self.safety_monitor = SafetyMonitor()
@@ -313,8 +314,7 @@ class StreamingService:
     def get_metrics(self):
         """Get system and streaming metrics"""
         # System metrics
-        cpu = psutil.cpu_percent(interval=0.1)
-        memory = psutil.virtual_memory().percent
+        cpu, memory = get_system_metrics_sampler().get_usage()
         net_io = psutil.net_io_counters()
         network = min(100, (net_io.bytes_sent + net_io.bytes_recv) / 1e7)
         